@@ -1,5 +1,6 @@
 """改行コードをLFに変換するスクリプト"""
 import os
+from pathlib import Path
 
 files = [
     'blog_app.py',
@@ -18,16 +19,17 @@ files = [
 
 count = 0
 for f in files:
-    if os.path.exists(f):
-        data = open(f, 'rb').read()
-        new = data.replace(b'\r\n', b'\n')
-        if data != new:
-            open(f, 'wb').write(new)
-            count += 1
-            print(f'Fixed: {f}')
-        else:
-            print(f'OK: {f}')
-    else:
+    p = Path(f)
+    if not p.exists():
         print(f'Skip: {f}')
+        continue
+    data = p.read_bytes()
+    # CRLFが無ければ置換（全体のコピー）をせずに済ませる
+    if b'\r\n' not in data:
+        print(f'OK: {f}')
+        continue
+    p.write_bytes(data.replace(b'\r\n', b'\n'))
+    count += 1
+    print(f'Fixed: {f}')
 
 print(f'\nTotal fixed: {count}')
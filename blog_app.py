@@ -6,17 +6,48 @@ Blog Article Generator - Streamlit管理UI
 """
 
 import streamlit as st
+import gc
 import os
+import re
 import json
 import glob
+import concurrent.futures
 from datetime import datetime
 
-import blog_generator
-import web_researcher
-import wp_publisher
+# orjson があれば記事JSONの読み込みに使う（標準jsonより高速。どちらもbytesを受け付ける）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# blog_generator / web_researcher / wp_publisher は requests や bs4 などの
+# 重い依存を引き込むため、起動を速くするよう使う場所で遅延importする
 import source_loader
 import affiliate_manager
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# blog_generator.ARTICLES_DIR と同じ場所（履歴表示のためだけに重いimportをしない）
+ARTICLES_DIR = os.path.join(BASE_DIR, "generated_articles")
+ARTICLES_INDEX_FILE = os.path.join(ARTICLES_DIR, "index.jsonl")
+
+# 再実行のたびに大量の一時オブジェクトが作られるため、世代0のGC頻度を下げて停止を減らす
+# （生成処理の後には明示的に gc.collect() する）
+gc.set_threshold(50_000, 10, 10)
+
+# 記事HTMLの後処理で使う正規表現（生成のたびにコンパイルしないよう事前に用意）
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_JSON_LD_RE = re.compile(r'<script type="application/ld\+json">.*?</script>', re.DOTALL)
+_NOTE_RULES = [
+    (re.compile(r'<h2>(.*?)</h2>'), r'\n\n■ \1\n'),  # H2をnote風の大見出しに
+    (re.compile(r'<h3>(.*?)</h3>'), r'\n● \1\n'),  # H3をnote風の小見出しに
+    (re.compile(r'<strong>(.*?)</strong>'), r'【\1】'),  # 強調を隅付き括弧に
+    (re.compile(r'<li>(.*?)</li>'), r'・\1\n'),  # リスト
+    (re.compile(r'<br\s*/?>'), '\n'),  # 改行
+    (_HTML_TAG_RE, ''),  # 残りのHTMLタグをすべて削除
+]
+_EXTRA_NEWLINES_RE = re.compile(r'\n{3,}')
+
 # ==========================================
 # ページ設定
 # ==========================================
@@ -30,8 +61,9 @@ st.set_page_config(
 # ==========================================
 # カスタムCSS
 # ==========================================
-st.markdown("""
-<style>
+# Streamlitは再実行で出力されなかった要素を消すため、CSSは毎回出力する必要がある。
+# 送信量を減らすため、コメントと余分な空白を起動時に1回だけ取り除いておく。
+_CUSTOM_CSS_SOURCE = """
     /* 全体のフォント */
     .main { font-family: 'Noto Sans JP', 'Hiragino Sans', sans-serif; }
     
@@ -87,8 +119,71 @@ st.markdown("""
         margin: 5px 0;
         font-size: 0.9em;
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+
+def _minify_css(css):
+    """CSSからコメントと余分な空白を取り除く"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,])\s*', r'\1', css)
+    return css.strip()
+
+
+_CUSTOM_CSS_HTML = f"<style>{_minify_css(_CUSTOM_CSS_SOURCE)}</style>"
+
+st.markdown(_CUSTOM_CSS_HTML, unsafe_allow_html=True)
+
+
+# ==========================================
+# ソース読み込みキャッシュ
+# ==========================================
+# Streamlitはウィジェット操作のたびにスクリプト全体を再実行するため、
+# ファイル走査やPDF/Excel解析をキャッシュして再実行コストを抑える。
+
+def _sources_signature():
+    """ソースフォルダと保存JSONの更新時刻から、キャッシュ用の軽量な署名を作る"""
+    paths = glob.glob(os.path.join(source_loader.SOURCES_DIR, "*"))
+    paths += [source_loader.INSTAGRAM_FILE, source_loader.WEB_SOURCES_FILE]
+    sig = []
+    for p in sorted(paths):
+        try:
+            sig.append((p, os.path.getmtime(p)))
+        except OSError:
+            continue
+    return tuple(sig)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_source_summary(sig):
+    """source_loader.get_source_summary() のキャッシュ版"""
+    return source_loader.get_source_summary()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_load_all_file_sources(sig):
+    """source_loader.load_all_file_sources() のキャッシュ版"""
+    return source_loader.load_all_file_sources()
+
+
+def _clear_source_caches():
+    """ソースの追加・削除後にキャッシュを破棄する"""
+    _cached_source_summary.clear()
+    _cached_load_all_file_sources.clear()
+
+
+# ==========================================
+# HTTPセッションのキャッシュ
+# ==========================================
+
+@st.cache_resource(show_spinner=False)
+def _get_wp_session(site_url):
+    """
+    WordPressサイトごとの接続プール付きセッションを再実行をまたいで保持する。
+    認証情報はリクエストごとのヘッダーで送るため、キーはサイトURLのみ。
+    """
+    import wp_publisher
+    return wp_publisher.create_session()
 
 
 # ==========================================
@@ -126,7 +221,6 @@ with st.sidebar:
                 "🔑 Gemini API Key", type="password",
                 help="Google Gemini APIのキーを入力"
             )
-        blog_generator.config_api(api_key, "gemini")
         
         if api_key and api_key.startswith("gsk_"):
             st.error("⚠️ 警告: 入力されたキーはGroq用のようです。Geminiを使うには `AIza...` で始まるGoogle APIキーが必要です。")
@@ -148,7 +242,6 @@ with st.sidebar:
                 "🔑 Groq API Key", type="password",
                 help="Groq APIのキーを入力"
             )
-        blog_generator.config_api(api_key, "groq")
 
         if api_key and api_key.startswith("AIza"):
             st.error("⚠️ 警告: 入力されたキーはGemini用のようです。Groqを使うには `gsk_...` で始まるAPIキーが必要です。")
@@ -165,12 +258,13 @@ with st.sidebar:
     wp_enabled = st.checkbox("WordPress連携を有効にする", value=False)
     
     if wp_enabled:
+        import wp_publisher
         wp_url = st.text_input("サイトURL", placeholder="https://sasayoshi-garden.com")
         wp_user = st.text_input("ユーザー名")
         wp_pass = st.text_input("アプリケーションパスワード", type="password")
         
         if wp_url and wp_user and wp_pass:
-            wp_publisher.configure(wp_url, wp_user, wp_pass)
+            wp_publisher.configure(wp_url, wp_user, wp_pass, session=_get_wp_session(wp_url))
             if st.button("🔌 接続テスト"):
                 success, msg = wp_publisher.test_connection()
                 if success:
@@ -186,6 +280,8 @@ with st.sidebar:
                             help="Web検索で取得する参考記事の数")
     do_research = st.checkbox("Web情報収集を行う", value=True,
                               help="オフにすると商品情報のみで記事を生成します")
+    ignore_cache = st.checkbox("キャッシュを使わずに再生成する", value=False,
+                               help="オンにすると、同じキーワードでも保存済みの検索結果・構成案・本文を使わずに作り直します")
     
     st.markdown("---")
     
@@ -198,7 +294,7 @@ with st.sidebar:
     else:
         st.info("💻 ローカルモード")
     
-    src_summary = source_loader.get_source_summary()
+    src_summary = _cached_source_summary(_sources_signature())
     st.markdown(f"""
     - 📄 テキスト: **{src_summary['text_count']}**件
     - 📑 PDF: **{src_summary['pdf_count']}**件
@@ -207,6 +303,7 @@ with st.sidebar:
     - 📷 Instagram: **{src_summary['instagram_count']}**件
     - **合計: {src_summary['total_count']}件**
     """)
+    st.caption("ファイルは対応形式の保存数です（読み込みに失敗するファイルも含みます）")
     
     st.markdown("---")
     st.markdown("### 📦 商品カテゴリ")
@@ -218,6 +315,15 @@ with st.sidebar:
     - 🔥 コナラ薪
     """)
 
+
+def _wp_ready():
+    """WordPress連携が有効かつ設定済みか（無効時はwp_publisherを読み込まない）"""
+    if not wp_enabled:
+        return False
+    import wp_publisher
+    return wp_publisher.is_configured()
+
+
 # ==========================================
 # メインヘッダー
 # ==========================================
@@ -243,6 +349,49 @@ tab_generate, tab_sources, tab_affiliate, tab_history, tab_preview = st.tabs([
 ])
 
 
+def _session_article(article_data):
+    """
+    session_state に置く用の軽量な記事データを返す。
+    research_data はスクレイピングした本文を含み大きいため、
+    プレビューで使う件数とタイトル・URLだけを残す。
+    """
+    research_data = article_data.get("research_data")
+    if not research_data:
+        return article_data
+    return {
+        **article_data,
+        "research_data": {
+            "source_count": research_data.get("source_count", 0),
+            "sources": [
+                {"title": s.get("title", ""), "url": s.get("url", "")}
+                for s in research_data.get("sources", [])
+            ],
+        },
+    }
+
+
+# ==========================================
+# 一覧表示のページ分割
+# ==========================================
+PAGE_SIZE = 10
+
+
+def _paginate(items, key):
+    """
+    一覧をPAGE_SIZE件ずつに区切り、現在のページ分だけを返す。
+    全件を毎回描画しないことで、再実行時にフロントへ送るデータ量を抑える。
+    """
+    total_pages = max(1, -(-len(items) // PAGE_SIZE))
+    if total_pages == 1:
+        return items
+    page = st.number_input(
+        f"ページ（全{total_pages}ページ / {len(items)}件）",
+        min_value=1, max_value=total_pages, value=1, step=1, key=key
+    )
+    start = (page - 1) * PAGE_SIZE
+    return items[start:start + PAGE_SIZE]
+
+
 # ==========================================
 # タブ1: 記事生成
 # ==========================================
@@ -303,11 +452,11 @@ with tab_generate:
             "レモン 苗 接ぎ木 育て方",
         ]
         
-        # 3列で表示
+        # 3列で表示（列ごとに1つのコードブロックにまとめ、ウィジェット数を抑える）
         cols = st.columns(3)
-        for i, suggestion in enumerate(keyword_suggestions):
-            with cols[i % 3]:
-                st.code(suggestion, language=None)
+        for i, col in enumerate(cols):
+            with col:
+                st.code("\n".join(keyword_suggestions[i::3]), language=None)
     
     with col_info:
         st.subheader("📋 生成の流れ")
@@ -363,6 +512,9 @@ with tab_generate:
         elif not keyword:
             st.error("⚠️ キーワードを入力してください")
         else:
+            import blog_generator
+            import web_researcher
+
             # API設定（サイドバーの選択に応じて）
             backend = "groq" if ai_backend == "Groq (LLaMA)" else "gemini"
             blog_generator.config_api(api_key, backend)
@@ -374,17 +526,27 @@ with tab_generate:
             
             with st.status("📝 記事生成中...", expanded=True) as status:
                 
+                # Web情報収集はネットワーク待ちが長いので、独自ソースの読み込み中に裏で開始しておく
+                research_future = None
+                if do_research:
+                    research_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+                    research_future = research_executor.submit(
+                        web_researcher.research_keyword, keyword, max_sources=max_sources,
+                        use_cache=not ignore_cache
+                    )
+                    research_executor.shutdown(wait=False)
+                
                 # ステップ0: 独自ソース読み込み
                 st.write("📂 **Step 0:** 独自ソース読み込み中...")
                 custom_sources_text = source_loader.get_all_sources_text(keyword)
-                src_info = source_loader.get_source_summary()
-                st.write(f"  ✅ ファイル: {src_info['total_file_count']}件 / Instagram: {src_info['instagram_count']}件")
+                src_info = _cached_source_summary(_sources_signature())
+                st.write(f"  ✅ 保存ファイル: {src_info['total_file_count']}件 / Instagram: {src_info['instagram_count']}件")
                 
                 # ステップ1: Web情報収集
                 st.write("🔍 **Step 1:** Web情報を収集中...")
                 research_data = None
-                if do_research:
-                    research_data = web_researcher.research_keyword(keyword, max_sources=max_sources)
+                if research_future is not None:
+                    research_data = research_future.result()
                     if research_data["source_count"] > 0:
                         st.write(f"  ✅ {research_data['source_count']}件のソースを取得")
                         with st.expander("📄 取得したソース一覧"):
@@ -397,10 +559,12 @@ with tab_generate:
                 
                 # ステップ2: 構成案の生成
                 st.write("📋 **Step 2:** 記事構成案を生成中...")
+                # 同じ入力の構成案・本文は blog_generator 側のキャッシュから返る
                 outline_data, outline_error = blog_generator.generate_article_outline(
                     full_keyword, research_data, api_key,
                     custom_sources_text=custom_sources_text,
-                    target_product=target_product
+                    target_product=target_product,
+                    use_cache=not ignore_cache
                 )
                 
                 if outline_error:
@@ -422,19 +586,30 @@ with tab_generate:
                 
                 # 進捗表示用のプレースホルダー
                 progress_placeholder = st.empty()
+                # 書き上がった章から順に表示するプレースホルダー
+                draft_placeholder = st.empty()
                 
                 def update_progress(msg):
                     progress_placeholder.info(msg)
                 
-                article_html, body_error = blog_generator.generate_article_body(
+                def update_draft(partial_html):
+                    draft_placeholder.markdown(partial_html, unsafe_allow_html=True)
+                
+                # コールバックは外側の st.empty() に描画するので st.cache_data には通さない
+                # （キャッシュヒット時の再生で CacheReplayClosureError になるため）
+                article_html, body_error = blog_generator.generate_article_body_cached(
                     full_keyword, outline_data, research_data, api_key,
                     custom_sources_text=custom_sources_text,
                     progress_callback=update_progress,
-                    target_product=target_product
+                    target_product=target_product,
+                    html_callback=update_draft,
+                    use_cache=not ignore_cache
                 )
                 
                 # 生成が終わったらプレースホルダーを消去または完了表示
+                # （完成した記事は下のプレビューで改めて表示する）
                 progress_placeholder.empty()
+                draft_placeholder.empty()
                 
                 if body_error:
                     st.error(f"本文生成エラー: {body_error}")
@@ -442,17 +617,15 @@ with tab_generate:
                     st.stop()
                 
                 # 文字数カウント（HTMLタグ除去）
-                import re
-                plain_text = re.sub(r'<[^>]+>', '', article_html)
-                char_count = len(plain_text)
+                char_count = len(_HTML_TAG_RE.sub('', article_html))
                 st.write(f"  ✅ 記事生成完了！（約{char_count:,}文字）")
                 
                 # --- SEO強化: スキーマ（JSON-LD）の抽出と再配置 ---
                 # 各章でバラバラに生成されたJSON-LDを見つけて抽出し、記事の最後にまとめて配置する
-                schema_scripts = re.findall(r'<script type="application/ld\+json">.*?</script>', article_html, re.DOTALL)
+                schema_scripts = _JSON_LD_RE.findall(article_html)
                 if schema_scripts:
                     # 本文から一旦スクリプトを削除
-                    article_html = re.sub(r'<script type="application/ld\+json">.*?</script>', '', article_html, flags=re.DOTALL)
+                    article_html = _JSON_LD_RE.sub('', article_html)
                     # 最後にまとめて追加
                     combined_schema = "\n\n<!-- SEO Schema Data -->\n" + "\n".join(schema_scripts)
                     article_html += combined_schema
@@ -465,7 +638,8 @@ with tab_generate:
                     "meta_description": outline_data.get("meta_description", ""),
                     "outline": outline_data,
                     "article_html": article_html,
-                    "research_data": research_data,
+                    # 保存用に切り詰めたもの（全文は本文生成で使い終わっている）
+                    "research_data": blog_generator.trim_research_data(research_data),
                     "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                     "error": None
                 }
@@ -480,14 +654,12 @@ with tab_generate:
                     article_html = article_html + footer_html
                     article_data["article_html"] = article_html
                 
-                # セッションに保存（プレビュー用）
-                st.session_state["latest_article"] = article_data
+                # セッションに保存（プレビュー用。リサーチ本文は持たずディスク上のJSONのみに残す）
+                st.session_state["latest_article"] = _session_article(article_data)
                 
                 # ステップ4: ファイル保存
                 st.write("💾 **Step 4:** ファイルを保存中...")
-                html_path = blog_generator.save_article_html(article_data)
-                wp_path = blog_generator.save_article_wp_content(article_data)
-                json_path = blog_generator.save_article_json(article_data)
+                html_path, wp_path, json_path = blog_generator.save_article_bundle(article_data)
                 
                 if html_path:
                     st.write(f"  ✅ プレビュー用HTML: `{os.path.basename(html_path)}`")
@@ -507,6 +679,9 @@ with tab_generate:
                 
                 status.update(label="✅ 記事生成完了！", state="complete", expanded=False)
             
+            # 生成で溜まった一時オブジェクトをまとめて回収
+            gc.collect()
+            
             # 生成結果のプレビュー
             st.markdown("---")
             st.subheader("📄 生成された記事")
@@ -532,21 +707,17 @@ with tab_generate:
                 
             # note用テキストソース（簡易マークダウン）
             with st.expander("📝 note用テキスト（コピペ用）"):
-                import re
                 # HTMLからnote向けにタグを除去・変換
                 note_text = article_html
-                note_text = re.sub(r'<h2>(.*?)</h2>', r'\n\n■ \1\n', note_text) # H2をnote風の大見出しに
-                note_text = re.sub(r'<h3>(.*?)</h3>', r'\n● \1\n', note_text) # H3をnote風の小見出しに
-                note_text = re.sub(r'<strong>(.*?)</strong>', r'【\1】', note_text) # 強調を隅付き括弧に
-                note_text = re.sub(r'<li>(.*?)</li>', r'・\1\n', note_text) # リスト
-                note_text = re.sub(r'<br\s*/?>', '\n', note_text) # 改行
-                note_text = re.sub(r'<[^>]+>', '', note_text) # 残りのHTMLタグをすべて削除
-                note_text = re.sub(r'\n{3,}', '\n\n', note_text).strip() # 余分な改行を整理
+                for pattern, repl in _NOTE_RULES:
+                    note_text = pattern.sub(repl, note_text)
+                note_text = _EXTRA_NEWLINES_RE.sub('\n\n', note_text).strip() # 余分な改行を整理
                 
                 st.code(note_text, language="markdown")
             
             # WordPress下書き投稿
-            if wp_publisher.is_configured():
+            if _wp_ready():
+                import wp_publisher
                 st.markdown("---")
                 if st.button("📤 WordPressに下書き投稿する"):
                     success, result = wp_publisher.create_draft(
@@ -563,7 +734,12 @@ with tab_generate:
 # ==========================================
 # タブ2: ソース管理
 # ==========================================
-with tab_sources:
+# ソース管理タブはフラグメント化し、タブ内の操作（URL入力・ページ切替・プレビュー表示など）で
+# アプリ全体（サイドバーのソース集計など）が再実行されないようにする。
+# 保存・削除後は st.rerun() でアプリ全体を更新する。
+@st.fragment
+def _render_sources_tab():
+    """タブ2: ソース管理"""
     st.subheader("📂 情報ソースの管理")
     st.markdown("ここでファイルのアップロードやInstagram投稿の貼り付けができます。追加したソースは記事生成時に自動的に参照されます。")
     
@@ -589,13 +765,14 @@ with tab_sources:
                         st.success(f"✅ 保存: {uploaded_file.name}")
                     else:
                         st.error(f"❌ 保存失敗: {uploaded_file.name}")
+                _clear_source_caches()
                 st.rerun()
         
         st.markdown("---")
         
         # 保存済みファイル一覧
         st.markdown("### 📋 保存済みファイル一覧")
-        file_sources = source_loader.load_all_file_sources()
+        file_sources = _cached_load_all_file_sources(_sources_signature())
         
         all_sources = (
             file_sources["text_sources"] +
@@ -605,17 +782,18 @@ with tab_sources:
         )
         
         if all_sources:
-            for src in all_sources:
+            for src in _paginate(all_sources, "page_file_sources"):
                 type_emoji = {"text": "📄", "pdf": "📑", "excel": "📊", "image": "📸"}.get(src["type"], "📁")
                 with st.expander(f"{type_emoji} {src['filename']}（{src.get('char_count', 0):,}文字）"):
                     if src["type"] != "image":
-                        st.text_area(
-                            "内容プレビュー",
-                            value=src.get("content", "")[:2000],
-                            height=200,
-                            disabled=True,
-                            key=f"file_preview_{src['filename']}"
-                        )
+                        if st.toggle("内容を表示", key=f"show_file_{src['filename']}"):
+                            st.text_area(
+                                "内容プレビュー",
+                                value=src.get("content", "")[:2000],
+                                height=200,
+                                disabled=True,
+                                key=f"file_preview_{src['filename']}"
+                            )
                     else:
                         st.markdown(f"画像ファイル: `{src['filepath']}`")
         else:
@@ -662,6 +840,7 @@ with tab_sources:
                         tags=insta_tags
                     )
                     if success:
+                        _clear_source_caches()
                         st.success(f"✅ @{insta_account} の投稿を保存しました！")
                     else:
                         st.error("❌ 保存に失敗しました")
@@ -673,16 +852,16 @@ with tab_sources:
         insta_sources = source_loader.load_instagram_sources()
         
         if insta_sources:
-            for src in reversed(insta_sources):  # 新しい順
+            for src in _paginate(insta_sources[::-1], "page_insta_sources"):  # 新しい順
                 with st.expander(f"📷 @{src['account_name']} ({src['saved_at'][:10]})"):
-                    st.markdown(f"**キャプション:**")
-                    st.text_area(
-                        "内容",
-                        value=src.get("caption", ""),
-                        height=150,
-                        disabled=True,
-                        key=f"insta_{src['id']}"
-                    )
+                    if st.toggle("キャプションを表示", key=f"show_insta_{src['id']}"):
+                        st.text_area(
+                            "内容",
+                            value=src.get("caption", ""),
+                            height=150,
+                            disabled=True,
+                            key=f"insta_{src['id']}"
+                        )
                     if src.get("post_url"):
                         st.markdown(f"🔗 [投稿を見る]({src['post_url']})")
                     if src.get("tags"):
@@ -690,6 +869,7 @@ with tab_sources:
                     
                     if st.button(f"🗑️ 削除", key=f"del_insta_{src['id']}"):
                         source_loader.delete_instagram_source(src["id"])
+                        _clear_source_caches()
                         st.rerun()
         else:
             st.info("📭 まだInstagramソースが登録されていません。")
@@ -736,6 +916,7 @@ with tab_sources:
                             tags=web_tags
                         )
                         if saved:
+                            _clear_source_caches()
                             lang_info = result.get("language", "不明")
                             st.success(f"✅ 保存完了: **{result['title']}**（{result['char_count']:,}文字 / 言語: {lang_info}）")
                             st.rerun()
@@ -764,6 +945,7 @@ with tab_sources:
                             tags=web_tags
                         )
                         if saved:
+                            _clear_source_caches()
                             st.success(f"✅ 保存完了: **{result['title']}**（{result['char_count']:,}文字）")
                             st.rerun()
                         else:
@@ -789,6 +971,7 @@ with tab_sources:
                                     saved_count += 1
                         
                         if saved_count > 0:
+                            _clear_source_caches()
                             st.success(f"✅ サイト巡回完了！**{saved_count}ページ**を保存しました")
                             st.rerun()
                         else:
@@ -800,23 +983,29 @@ with tab_sources:
     web_sources = source_loader.load_web_sources()
     if web_sources:
         st.markdown(f"**保存済み: {len(web_sources)}件**")
-        for src in reversed(web_sources):
+        for src in _paginate(web_sources[::-1], "page_web_sources"):
             with st.expander(f"🌐 {src.get('title', src['url'])}（{src.get('char_count', 0):,}文字）"):
                 st.markdown(f"🔗 [{src['url']}]({src['url']})")
                 if src.get("tags"):
                     st.markdown(f"🏷️ タグ: `{src['tags']}`")
-                st.text_area(
-                    "内容プレビュー",
-                    value=src.get("content", "")[:2000],
-                    height=150,
-                    disabled=True,
-                    key=f"web_{src['id']}"
-                )
+                if st.toggle("内容を表示", key=f"show_web_{src['id']}"):
+                    st.text_area(
+                        "内容プレビュー",
+                        value=src.get("content", "")[:2000],
+                        height=150,
+                        disabled=True,
+                        key=f"web_{src['id']}"
+                    )
                 if st.button(f"🗑️ 削除", key=f"del_web_{src['id']}"):
                     source_loader.delete_web_source(src["id"])
+                    _clear_source_caches()
                     st.rerun()
 
 
+with tab_sources:
+    _render_sources_tab()
+
+
 # ==========================================
 # タブ3: アフィリエイト管理
 # ==========================================
@@ -862,34 +1051,112 @@ with tab_affiliate:
 # ==========================================
 # タブ4: 生成履歴
 # ==========================================
-with tab_history:
+
+def _articles_signature():
+    """記事フォルダの更新時刻（ファイル追加・削除で変わる）をキャッシュキーにする"""
+    try:
+        return os.stat(ARTICLES_DIR).st_mtime
+    except OSError:
+        return None
+
+
+def _read_articles_index():
+    """save_article_bundle() が追記する index.jsonl を {JSONファイル名: メタ情報} で返す"""
+    saved = {}
+    if not os.path.exists(ARTICLES_INDEX_FILE):
+        return saved
+    try:
+        with open(ARTICLES_INDEX_FILE, "rb") as f:
+            for line in f:
+                try:
+                    meta = _json_loads(line)
+                    saved[meta["json"]] = meta
+                except (ValueError, KeyError):
+                    continue
+    except Exception as e:
+        print(f"履歴インデックス読み込みエラー: {e}")
+    return saved
+
+
+# 保存のたびにフォルダの更新時刻（キー）が変わるので、古いキーの一覧は残さない
+@st.cache_data(show_spinner=False, max_entries=1)
+def _list_articles(dir_mtime):
+    """
+    履歴一覧の表示に必要なメタ情報だけを集めたインデックスを作る（新しい順）。
+    index.jsonl に記録済みの記事はJSON本体を開かず、未記録の古い記事だけ読み込む。
+    """
+    json_files = sorted(
+        glob.glob(os.path.join(ARTICLES_DIR, "*.json")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    saved = _read_articles_index()
+    # 保存時にファイル名が記録されていない古い記事用に、フォルダ内の一覧を1回だけ取る
+    existing_files = set(os.listdir(ARTICLES_DIR))
+    index = []
+    for json_file in json_files:
+        filename = os.path.basename(json_file)
+        entry = {"path": json_file, "filename": filename, "error": None}
+        meta = saved.get(filename)
+        if meta:
+            entry["title"] = meta.get("title") or "無題"
+            entry["keyword"] = meta.get("keyword", "")
+            entry["generated_at"] = meta.get("generated_at", "")
+            wp_filename = meta.get("wp_html")
+        else:
+            try:
+                data = _load_article(json_file)
+                entry["title"] = data.get("title", "無題")
+                entry["keyword"] = data.get("keyword", "")
+                entry["generated_at"] = data.get("generated_at", "")
+                wp_filename = data.get("_paths", {}).get("wp_html")
+            except Exception as e:
+                entry["error"] = str(e)
+                index.append(entry)
+                continue
+            if not wp_filename:
+                # 対応するWP用HTMLファイル（保存時の命名規則から推定）
+                guessed = filename.replace(".json", "_wp.html")
+                wp_filename = guessed if guessed in existing_files else None
+        entry["wp_html_path"] = os.path.join(ARTICLES_DIR, wp_filename) if wp_filename else None
+        index.append(entry)
+    return index
+
+
+def _load_article(json_file):
+    """記事JSONを1件だけ読み込む（プレビュー・投稿時のみ）"""
+    with open(json_file, "rb") as f:
+        return _json_loads(f.read())
+
+
+@st.fragment
+def _render_history_tab():
+    """タブ4: 生成履歴（ページ切替やボタン操作はこのタブ内だけ再実行）"""
     st.subheader("📚 生成した記事の履歴")
     
-    articles_dir = blog_generator.ARTICLES_DIR
+    articles_dir = ARTICLES_DIR
     
     if os.path.exists(articles_dir):
-        # JSONファイル一覧を取得（新しい順）
-        json_files = sorted(
-            glob.glob(os.path.join(articles_dir, "*.json")),
-            key=os.path.getmtime,
-            reverse=True
-        )
+        # 記事インデックスを取得（新しい順・キャッシュ済み）
+        article_index = _list_articles(_articles_signature())
         
-        if json_files:
-            for json_file in json_files:
+        if article_index:
+            for entry in _paginate(article_index, "page_history"):
+                json_file = entry["path"]
+                filename = entry["filename"]
+                
+                if entry["error"]:
+                    st.warning(f"ファイル読み込みエラー: {filename} - {entry['error']}")
+                    continue
+                
                 try:
-                    with open(json_file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    filename = os.path.basename(json_file)
-                    
                     with st.container():
                         st.markdown(f"""
                         <div class="article-card">
-                            <h3 style="margin:0 0 5px 0;">{data.get('title', '無題')}</h3>
+                            <h3 style="margin:0 0 5px 0;">{entry['title']}</h3>
                             <p style="color:#666; margin:0;">
-                                🔑 {data.get('keyword', '')} | 
-                                📅 {data.get('generated_at', '')} | 
+                                🔑 {entry['keyword']} | 
+                                📅 {entry['generated_at']} | 
                                 📄 {filename}
                             </p>
                         </div>
@@ -898,22 +1165,18 @@ with tab_history:
                         col1, col2, col3 = st.columns(3)
                         with col1:
                             if st.button(f"👁️ プレビュー", key=f"preview_{filename}"):
-                                st.session_state["preview_article"] = data
+                                st.session_state["preview_article"] = _session_article(_load_article(json_file))
+                                # プレビュータブへ反映するためアプリ全体を再実行
+                                st.rerun()
                         with col2:
-                            # 対応するWP用HTMLファイルのパス
-                            wp_filename = filename.replace(".json", "_wp.html")
-                            # 元のファイル名パターンから探す
-                            base_name = filename.replace(".json", "")
-                            wp_html_path = os.path.join(articles_dir, f"{base_name}_wp.html")
-                            if not os.path.exists(wp_html_path):
-                                # ファイル名に_wpが含まれていない場合
-                                wp_html_path = os.path.join(articles_dir, wp_filename)
-                            
-                            if os.path.exists(wp_html_path):
-                                st.markdown(f"📋 [WP用HTML]({wp_html_path})")
+                            # 対応するWP用HTMLファイルのパス（インデックス作成時に解決済み）
+                            if entry["wp_html_path"]:
+                                st.markdown(f"📋 [WP用HTML]({entry['wp_html_path']})")
                         with col3:
-                            if wp_publisher.is_configured():
+                            if _wp_ready():
+                                import wp_publisher
                                 if st.button(f"📤 WP投稿", key=f"wp_{filename}"):
+                                    data = _load_article(json_file)
                                     success, result = wp_publisher.create_draft(
                                         title=data.get("title", ""),
                                         content=data.get("article_html", ""),
@@ -927,13 +1190,17 @@ with tab_history:
                         st.markdown("---")
                 
                 except Exception as e:
-                    st.warning(f"ファイル読み込みエラー: {os.path.basename(json_file)} - {e}")
+                    st.warning(f"ファイル読み込みエラー: {filename} - {e}")
         else:
             st.info("📭 まだ記事が生成されていません。「記事生成」タブでキーワードを入力して始めましょう！")
     else:
         st.info("📭 まだ記事保存フォルダが作成されていません。")
 
 
+with tab_history:
+    _render_history_tab()
+
+
 # ==========================================
 # タブ3: プレビュー
 # ==========================================
@@ -12,10 +12,28 @@ Gemini APIを使い、SEO最適化されたブログ記事を生成する。
 import os
 import json
 import random
+import copy
+import collections
+import string
+import hashlib
+import unicodedata
+import functools
 import requests
 import re
 import time
+import threading
+import concurrent.futures
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson があれば記事JSONの書き出しやAI応答のJSON解析に使う（標準jsonより高速）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
 
 import web_researcher
 import source_loader
@@ -28,6 +46,20 @@ import prompts
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PRODUCT_INFO_PATH = os.path.join(BASE_DIR, "blog_data", "product_info.txt")
 ARTICLES_DIR = os.path.join(BASE_DIR, "generated_articles")
+# 検出済みGeminiモデルの保存先（ドットファイルなので履歴の *.json 一覧には出ない）
+MODEL_CACHE_FILE = os.path.join(ARTICLES_DIR, ".gemini_model.json")
+# 同一プロンプトへのAI応答キャッシュ（1応答1ファイル）
+RESPONSE_CACHE_DIR = os.path.join(BASE_DIR, "blog_data", "llm_cache")
+RESPONSE_CACHE_TTL = 60 * 60  # 1時間
+# これより高い temperature の応答は毎回違う文章がほしいのでキャッシュしない（deterministic は temperature=0）
+RESPONSE_CACHE_MAX_TEMPERATURE = 0.3
+# ディスクの応答キャッシュの手前に置くメモリ上のLRU（件数上限）
+RESPONSE_MEMORY_CACHE_SIZE = 256
+# 表記ゆれを吸収する構成案キャッシュ（メモリ上のLRU。件数上限）
+OUTLINE_CACHE_SIZE = 64
+# 生成済み本文のメモリキャッシュ（generate_article_body_cached 用）
+BODY_CACHE_TTL = 24 * 60 * 60  # 24時間
+BODY_CACHE_SIZE = 32
 
 GOOGLE_API_KEY = ""
 GROQ_API_KEY = ""
@@ -35,27 +67,99 @@ GROQ_API_KEY = ""
 # AIバックエンド設定: "gemini" or "groq"
 AI_BACKEND = "gemini"
 
-# 記事保存ディレクトリが無ければ作成
-os.makedirs(ARTICLES_DIR, exist_ok=True)
+# AI API用の共通HTTPセッション（TLS接続を使い回す）
+# POSTは冪等でないため urllib3 側では再送せず、429等は generate_content_api のリトライに任せる
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=8, pool_maxsize=32,
+    max_retries=Retry(
+        total=3, backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+)
+_SESSION.mount("https://", _adapter)
+
+# (接続, 読み込み) タイムアウト秒
+API_TIMEOUT = (5, 120)
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODELS_URL = "https://api.groq.com/openai/v1/models"
+
+# Groqは工程ごとにモデルを使い分ける
+# 構成案は小さなJSONなので高速な8Bモデル、本文は品質重視で70Bモデル
+GROQ_MODEL_OUTLINE = "llama-3.1-8b-instant"
+GROQ_MODEL_BODY = "llama-3.3-70b-versatile"
+
+# 1回の呼び出しで出力できるトークン数の上限
+# 既定値（上限を指定しない呼び出し用）
+GEMINI_MAX_OUTPUT_TOKENS = 16384
+GROQ_MAX_TOKENS = 8000  # Groqのトークン制限に合わせる
+# 構成案はJSONだけなので小さく、本文は1章（H2）ぶん書ければ足りる
+OUTLINE_MAX_TOKENS = 2048
+SECTION_MAX_TOKENS = 4096
+
+# 複数キーワードをまとめて生成する時に同時に進める記事数
+# （1記事あたり最大 BODY_SECTION_WORKERS 本のAPI呼び出しが並ぶため控えめにする）
+BATCH_MAX_CONCURRENCY = 3
+
+# 本文の章（H2）を同時に生成する最大数（APIのレート制限に当たらない程度に抑える）
+BODY_SECTION_WORKERS = 4
+
+# 執筆中の章の途中経過を html_callback に渡す間隔（秒）
+DRAFT_REFRESH_INTERVAL = 0.5
+
+# 章の生成に失敗した際に本文の代わりに入れる注記
+SECTION_SKIPPED_NOTE = "※生成エラーにより本文をスキップしました。"
 
 
 # ==========================================
 # 商品情報ロード
 # ==========================================
 
-def load_product_info():
-    """product_info.txt から商品データを読み込む"""
-    if not os.path.exists(PRODUCT_INFO_PATH):
+# プロンプトに入れる商品情報の最大文字数
+PRODUCT_INFO_OUTLINE_CHARS = 3000
+PRODUCT_INFO_BODY_CHARS = 2000
+
+
+@functools.lru_cache(maxsize=4)
+def _load_product_info_cached(mtime):
+    """更新時刻をキーにして product_info.txt の内容をキャッシュする"""
+    with open(PRODUCT_INFO_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=8)
+def _product_info_slice(mtime, max_chars):
+    """プロンプト用に切り詰めた商品情報もファイル更新まで使い回す"""
+    return _load_product_info_cached(mtime)[:max_chars]
+
+
+def load_product_info(max_chars=None):
+    """
+    product_info.txt から商品データを読み込む（ファイルが更新されるまでキャッシュ）。
+    max_chars を指定すると、その文字数までに切り詰めたものを返す。
+    """
+    try:
+        mtime = os.path.getmtime(PRODUCT_INFO_PATH)
+    except OSError:
         print(f"⚠ 商品情報ファイルが見つかりません: {PRODUCT_INFO_PATH}")
         return ""
     try:
-        with open(PRODUCT_INFO_PATH, "r", encoding="utf-8") as f:
-            return f.read()
+        if max_chars is None:
+            return _load_product_info_cached(mtime)
+        return _product_info_slice(mtime, max_chars)
     except Exception as e:
         print(f"商品情報読み込みエラー: {e}")
         return ""
 
 
+def clear_product_info_cache():
+    """商品情報のキャッシュを破棄する（mtimeが変わらない置き換えをした場合など）"""
+    _load_product_info_cached.cache_clear()
+    _product_info_slice.cache_clear()
+
+
 # ==========================================
 # AI API 関連
 # ==========================================
@@ -66,8 +170,12 @@ def config_api(api_key, backend="gemini", groq_key=""):
     AI_BACKEND = backend
     if backend == "gemini":
         GOOGLE_API_KEY = api_key
+        # Web調査などをしている間にモデル検出を済ませておく
+        warm_model_cache(api_key)
     elif backend == "groq":
         GROQ_API_KEY = api_key if api_key else groq_key
+        if GROQ_API_KEY:
+            warm_connection(GROQ_MODELS_URL, {"Authorization": f"Bearer {GROQ_API_KEY}"})
 
 
 def config_gemini(api_key):
@@ -88,46 +196,189 @@ def find_best_model(api_key):
     for version in ["v1", "v1beta"]:
         url = f"https://generativelanguage.googleapis.com/{version}/models?key={api_key}"
         try:
-            response = requests.get(url)
+            # 一時的な通信エラーや 429/5xx はセッションのRetryが指数バックオフで再試行する
+            response = _SESSION.get(url, timeout=API_TIMEOUT)
+            if response.status_code in (400, 401, 403):
+                # APIキーの誤りなど恒久的なエラーは、別のAPIバージョンでも結果が同じなので打ち切る
+                print(f"⚠ モデル一覧の取得に失敗しました（{version}）: {response.status_code} - {response.text[:200]}")
+                break
             if response.status_code == 200:
                 data = response.json()
-                models = data.get("models", [])
-                available = []
-                for m in models:
-                    if "generateContent" in m.get("supportedGenerationMethods", []):
-                        available.append(m.get("name", ""))
+                # generateContent対応モデルのIDを、APIが返した順番のまま一覧にする
+                available = [
+                    m.get("name", "").removeprefix("models/")
+                    for m in data.get("models", [])
+                    if "generateContent" in m.get("supportedGenerationMethods", [])
+                ]
 
+                # 優先順位の高い順に、名前を含むモデルを探す
                 for pref in preferred:
-                    for avail in available:
-                        if pref in avail:
-                            model_id = avail.replace("models/", "")
-                            return version, model_id
+                    match = next((model_id for model_id in available if pref in model_id), None)
+                    if match:
+                        return version, match
 
                 if available:
-                    model_id = available[0].replace("models/", "")
-                    return version, model_id
-        except:
+                    return version, available[0]
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠ モデル一覧の取得に失敗しました（{version}）: {e}")
             continue
 
     return None, None
 
 
-def generate_content_gemini(api_key, system_prompt, user_prompt, temperature=0.7):
-    """Gemini APIを叩いてテキストを生成する"""
+# 検出済みモデルのキャッシュ {APIキーのハッシュ: (api_version, model_id)}
+_MODEL_CACHE = {}
+_model_cache_lock = threading.Lock()
+
+
+def _api_key_digest(api_key):
+    """APIキーそのものを保存しないようにハッシュ化したキーを返す"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_model_cache_file():
+    try:
+        with open(MODEL_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
 
-    api_version, model_id = find_best_model(api_key)
 
-    if not api_version or not model_id:
-        return None, "API Error: 利用可能なGeminiモデルが見つかりません。APIキーを確認してください。"
+def _write_model_cache_file(data):
+    try:
+        os.makedirs(ARTICLES_DIR, exist_ok=True)
+        with open(MODEL_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"⚠ モデルキャッシュ保存エラー: {e}")
 
-    url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model_id}:generateContent?key={api_key}"
-    print(f"★ Using Gemini: {api_version}/models/{model_id}")
 
+def get_cached_model(api_key):
+    """
+    利用するGeminiモデルを返す。
+    環境変数 GEMINI_MODEL（例: gemini-1.5-flash）と GEMINI_API_VERSION（省略時 v1beta）が
+    設定されていればそれを使う。無ければメモリ → ディスクの順にキャッシュを見て、
+    それも無ければ find_best_model で検出する。
+    """
+    # 環境変数でモデルが固定されていれば検出もキャッシュも使わない
+    pinned = os.environ.get("GEMINI_MODEL")
+    if pinned:
+        return os.environ.get("GEMINI_API_VERSION", "v1beta"), pinned
+
+    digest = _api_key_digest(api_key)
+    cached = _MODEL_CACHE.get(digest)
+    if cached:
+        return cached
+
+    # 並列の章生成や事前検出スレッドと同時に来ても、検出（ListModels）は1回で済ませる
+    with _model_cache_lock:
+        cached = _MODEL_CACHE.get(digest)
+        if cached:
+            return cached
+
+        saved = _read_model_cache_file().get(digest)
+        if isinstance(saved, list) and len(saved) == 2:
+            _MODEL_CACHE[digest] = tuple(saved)
+            return _MODEL_CACHE[digest]
+
+        api_version, model_id = find_best_model(api_key)
+        if api_version and model_id:
+            _MODEL_CACHE[digest] = (api_version, model_id)
+            data = _read_model_cache_file()
+            data[digest] = [api_version, model_id]
+            _write_model_cache_file(data)
+        return api_version, model_id
+
+
+def warm_model_cache(api_key):
+    """
+    Geminiモデルの検出をバックグラウンドで先に済ませておく。
+    最初の生成リクエストが来た時にはキャッシュ済みになっているようにするため。
+    モデルが既に分かっている場合は、接続だけを先に張っておく。
+    """
+    if not api_key:
+        return
+    if os.environ.get("GEMINI_MODEL") or _MODEL_CACHE.get(_api_key_digest(api_key)):
+        # モデルは分かっているので、接続（DNS・TLS）だけ張っておく
+        warm_connection(f"https://generativelanguage.googleapis.com/v1beta/models?pageSize=1&key={api_key}")
+        return
+    threading.Thread(target=get_cached_model, args=(api_key,), daemon=True).start()
+
+
+def _warm_up(url, headers=None):
+    try:
+        _SESSION.get(url, headers=headers, timeout=API_TIMEOUT)
+    except requests.RequestException:
+        pass
+
+
+def warm_connection(url, headers=None):
+    """
+    軽いGETをバックグラウンドで送り、APIサーバーへのKeep-Alive接続を先に張っておく。
+    最初の生成リクエストでDNS解決・TLSハンドシェイクを待たずに済むようにするため。
+    """
+    threading.Thread(target=_warm_up, args=(url, headers), daemon=True).start()
+
+
+def invalidate_model_cache(api_key):
+    """キャッシュ済みモデルが使えなくなった時に破棄する"""
+    digest = _api_key_digest(api_key)
+    with _model_cache_lock:
+        _MODEL_CACHE.pop(digest, None)
+        data = _read_model_cache_file()
+        if data.pop(digest, None) is not None:
+            _write_model_cache_file(data)
+
+
+def _iter_sse_json(response):
+    """SSEレスポンスの `data: {...}` 行をJSONとして1件ずつ返す（[DONE]で終了）"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            break
+        try:
+            yield json.loads(payload)
+        except ValueError:
+            continue
+
+
+def _is_model_unavailable(response):
+    """
+    Gemini のエラー応答が「モデルが存在しない・使えない」を意味するならTrue。
+    404 か、400 のうち本文がモデル未検出・未対応を示すものだけ（ペイロードの誤りなどは除く）。
+    """
+    if response.status_code == 404:
+        return True
+    if response.status_code != 400:
+        return False
+    message = response.text.lower()
+    return "not found" in message or "not supported" in message or "unsupported" in message
+
+
+def _is_json_mode_rejected(response):
+    """JSONモードの指定（responseMimeType / responseSchema）が拒否された 400 ならTrue"""
+    if response.status_code != 400:
+        return False
+    message = response.text.lower()
+    return any(name in message for name in ("responsemimetype", "response_mime_type", "responseschema", "response_schema", "json mode"))
+
+
+def generate_content_gemini(api_key, system_prompt, user_prompt, temperature=0.7, on_token=None, max_tokens=None, top_p=0.95, top_k=40, json_schema=None):
+    """
+    Gemini APIを叩いてテキストを生成する。
+    on_token を渡すとストリーミング（SSE）で受信し、届いた断片ごとに on_token(chunk) を呼ぶ。
+    json_schema を渡すとJSONモード（responseMimeType + responseSchema）で出力させる
+    （v1beta のモデルのみ。v1 の場合や拒否された場合は指定せずに通常の出力で呼ぶ）。
+    """
     headers = {"Content-Type": "application/json"}
 
     data = {
         "contents": [
             {
+                # 固定のシステムプロンプトを必ず先頭に置く（暗黙のプレフィックスキャッシュ対象）
                 "parts": [
                     {"text": system_prompt + "\n\n" + user_prompt}
                 ]
@@ -135,9 +386,9 @@ def generate_content_gemini(api_key, system_prompt, user_prompt, temperature=0.7
         ],
         "generationConfig": {
             "temperature": temperature,
-            "topK": 40,
-            "topP": 0.95,
-            "maxOutputTokens": 16384  # ブログ記事用に大きめ
+            "topK": top_k,
+            "topP": top_p,
+            "maxOutputTokens": max_tokens or GEMINI_MAX_OUTPUT_TOKENS
         },
         "safetySettings": [
             {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
@@ -146,13 +397,57 @@ def generate_content_gemini(api_key, system_prompt, user_prompt, temperature=0.7
             {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
         ]
     }
+    # キャッシュ済みモデルが廃止・無効になっていた場合に備え、1回だけ再検出して再試行する
+    # （環境変数 GEMINI_MODEL で固定している場合は再検出しても同じモデルなので再試行しない）
+    pinned = bool(os.environ.get("GEMINI_MODEL"))
+    rediscovered = False
+    # JSONモードは v1beta のみ対応。拒否された場合は通常のプロンプトで出力させる（呼び出し側でJSONを抽出する）
+    json_mode = bool(json_schema)
+    for _ in range(3):
+        api_version, model_id = get_cached_model(api_key)
+
+        if not api_version or not model_id:
+            return None, "API Error: 利用可能なGeminiモデルが見つかりません。APIキーを確認してください。"
+
+        if on_token:
+            url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model_id}:streamGenerateContent?alt=sse&key={api_key}"
+        else:
+            url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model_id}:generateContent?key={api_key}"
+        print(f"★ Using Gemini: {api_version}/models/{model_id}")
 
-    try:
-        response = requests.post(url, headers=headers, json=data)
+        use_json = json_mode and api_version == "v1beta"
+        payload = data
+        if use_json:
+            payload = dict(data, generationConfig=dict(
+                data["generationConfig"], responseMimeType="application/json", responseSchema=json_schema
+            ))
+
+        try:
+            response = _SESSION.post(url, headers=headers, json=payload, timeout=API_TIMEOUT, stream=bool(on_token))
+        except Exception as e:
+            return None, f"Gemini API Exception: {e}"
+
+        if use_json and _is_json_mode_rejected(response):
+            print(f"⚠ {api_version}/models/{model_id} はJSONモードに対応していません。通常の出力で再試行します")
+            response.close()
+            json_mode = False
+            continue
+        if not rediscovered and not pinned and _is_model_unavailable(response):
+            print(f"⚠ モデル {model_id} が利用できません（{response.status_code}）。再検出します")
+            # ストリーミング時は本文を読まないので、接続をプールに返してから再試行する
+            response.close()
+            invalidate_model_cache(api_key)
+            rediscovered = True
+            continue
+        break
 
+    try:
         if response.status_code != 200:
             return None, f"Gemini API Error: {response.status_code} - {response.text[:500]}"
 
+        if on_token:
+            return _read_gemini_stream(response, on_token)
+
         result_json = response.json()
 
         if "candidates" in result_json and result_json["candidates"]:
@@ -162,18 +457,43 @@ def generate_content_gemini(api_key, system_prompt, user_prompt, temperature=0.7
             else:
                 return None, f"API Blocked: {candidate}"
         else:
-            return None, f"API Response Error: {json.dumps(result_json)[:500]}"
+            return None, f"API Response Error: {_dump_json_bytes(result_json).decode('utf-8')[:500]}"
 
     except Exception as e:
         return None, f"Gemini API Exception: {e}"
 
 
-def generate_content_groq(api_key, system_prompt, user_prompt, temperature=0.7):
-    """Groq API（OpenAI互換）を叩いてテキストを生成する"""
+def _read_gemini_stream(response, on_token):
+    """Gemini の streamGenerateContent（SSE）を読み切って全文を返す"""
+    chunks = []
+    last_candidate = None
+    with response:
+        for event in _iter_sse_json(response):
+            candidates = event.get("candidates") or []
+            if not candidates:
+                continue
+            last_candidate = candidates[0]
+            for part in last_candidate.get("content", {}).get("parts", []):
+                text = part.get("text")
+                if text:
+                    chunks.append(text)
+                    on_token(text)
+
+    if not chunks:
+        return None, f"API Blocked: {last_candidate}"
+    return "".join(chunks), None
+
+
+def generate_content_groq(api_key, system_prompt, user_prompt, temperature=0.7, on_token=None, max_tokens=None, top_p=0.95, model=None, json_mode=False):
+    """
+    Groq API（OpenAI互換）を叩いてテキストを生成する。
+    on_token を渡すとストリーミング（SSE）で受信し、届いた断片ごとに on_token(chunk) を呼ぶ。
+    model を省略すると本文用のモデル（GROQ_MODEL_BODY）を使う。
+    json_mode=True の場合は response_format でJSONオブジェクトのみを出力させる。
+    """
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    # ブログ記事向けに大きなコンテキストのモデルを使用
-    model = "llama-3.3-70b-versatile"
+    url = GROQ_CHAT_URL
+    model = model or GROQ_MODEL_BODY
     print(f"★ Using Groq: {model}")
 
     headers = {
@@ -188,16 +508,33 @@ def generate_content_groq(api_key, system_prompt, user_prompt, temperature=0.7):
             {"role": "user", "content": user_prompt}
         ],
         "temperature": temperature,
-        "max_tokens": 8000,  # Groqのトークン制限に合わせる
-        "top_p": 0.95,
+        "max_tokens": max_tokens or GROQ_MAX_TOKENS,
+        "top_p": top_p,
     }
+    if on_token:
+        data["stream"] = True
+    if json_mode:
+        data["response_format"] = {"type": "json_object"}
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=120)
+        response = _SESSION.post(url, headers=headers, json=data, timeout=API_TIMEOUT, stream=bool(on_token))
 
         if response.status_code != 200:
             return None, f"Groq API Error: {response.status_code} - {response.text[:500]}"
 
+        if on_token:
+            chunks = []
+            with response:
+                for event in _iter_sse_json(response):
+                    choices = event.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        chunks.append(delta)
+                        on_token(delta)
+            if not chunks:
+                return None, "Groq API: 空のレスポンス"
+            return "".join(chunks), None
+
         result_json = response.json()
 
         if "choices" in result_json and result_json["choices"]:
@@ -207,39 +544,142 @@ def generate_content_groq(api_key, system_prompt, user_prompt, temperature=0.7):
             else:
                 return None, "Groq API: 空のレスポンス"
         else:
-            return None, f"Groq API Response Error: {json.dumps(result_json)[:500]}"
+            return None, f"Groq API Response Error: {_dump_json_bytes(result_json).decode('utf-8')[:500]}"
 
     except Exception as e:
         return None, f"Groq API Exception: {e}"
 
 
-def generate_content_api(api_key, system_prompt, user_prompt, temperature=0.7, max_retries=3):
+# {キャッシュファイルパス: (保存時刻, 応答テキスト)}（古い順）
+_RESPONSE_MEMORY_CACHE = collections.OrderedDict()
+_response_memory_lock = threading.Lock()
+
+
+def _response_cache_path(backend, system_prompt, user_prompt, temperature, max_tokens=None, deterministic=False, model=None):
+    """バックエンド・プロンプト・サンプリング設定・出力上限が完全一致する応答のキャッシュファイルパス"""
+    key = hashlib.sha256(json.dumps({
+        "backend": backend,
+        "sys": system_prompt,
+        "user": user_prompt,
+        "temp": temperature,
+        "max_tokens": max_tokens,
+        "deterministic": deterministic,
+        "model": model,
+    }, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return os.path.join(RESPONSE_CACHE_DIR, f"{key}.txt")
+
+
+def _read_response_cache(cache_path):
+    """TTL内のキャッシュ済み応答があれば返す（メモリ → ディスクの順に探す）"""
+    now = time.time()
+    with _response_memory_lock:
+        entry = _RESPONSE_MEMORY_CACHE.get(cache_path)
+        if entry:
+            if now - entry[0] < RESPONSE_CACHE_TTL:
+                _RESPONSE_MEMORY_CACHE.move_to_end(cache_path)
+                return entry[1]
+            del _RESPONSE_MEMORY_CACHE[cache_path]
+
+    try:
+        saved_at = os.path.getmtime(cache_path)
+        if now - saved_at < RESPONSE_CACHE_TTL:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            _remember_response(cache_path, text, saved_at)
+            return text
+    except OSError:
+        pass
+    return None
+
+
+def _remember_response(cache_path, text, saved_at):
+    """応答をメモリ上のLRUにも載せる（古いものから RESPONSE_MEMORY_CACHE_SIZE 件を超えた分を捨てる）"""
+    with _response_memory_lock:
+        _RESPONSE_MEMORY_CACHE[cache_path] = (saved_at, text)
+        _RESPONSE_MEMORY_CACHE.move_to_end(cache_path)
+        while len(_RESPONSE_MEMORY_CACHE) > RESPONSE_MEMORY_CACHE_SIZE:
+            _RESPONSE_MEMORY_CACHE.popitem(last=False)
+
+
+def _write_response_cache(cache_path, text):
+    _remember_response(cache_path, text, time.time())
+    try:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠ 応答キャッシュ保存エラー: {e}")
+
+
+def _resolve_backend(api_key):
+    """APIキーからバックエンドを自動判定する（判定できなければ AI_BACKEND）"""
+    if api_key:
+        if api_key.startswith("gsk_"):
+            return "groq"
+        if api_key.startswith("AIza"):
+            return "gemini"
+    return AI_BACKEND
+
+
+def _resolved_model(backend, api_key, groq_model=None):
+    """キャッシュキー用に、実際に呼び出すモデルを "api_version/model_id"（Groqはモデル名）で返す"""
+    if backend == "groq":
+        return groq_model or GROQ_MODEL_BODY
+    return "/".join(filter(None, get_cached_model(api_key or GOOGLE_API_KEY)))
+
+
+def generate_content_api(api_key, system_prompt, user_prompt, temperature=0.7, max_retries=3, on_token=None, cache=True, max_tokens=None, deterministic=False, groq_model=None, json_schema=None):
     """
     現在のバックエンド設定に応じてAPIを叩く（統一インターフェース）
     ★エラー時の自動リトライ機能付き
+    on_token を渡すとストリーミングで受信し、生成された断片を逐次 on_token(chunk) に渡す。
+    cache=True の場合、同じプロンプト・同じモデルへの応答を RESPONSE_CACHE_TTL の間ディスクに保存して使い回す
+    （temperature が RESPONSE_CACHE_MAX_TEMPERATURE を超える創作的な呼び出しはキャッシュしない）。
+    max_tokens で1回の出力トークン上限を指定できる（省略時は各バックエンドの既定値）。
+    deterministic=True の場合は temperature=0 / topP=1 / topK=1 で呼び出し、同じ入力から同じ出力を得やすくする。
+    groq_model でGroq使用時のモデルを指定できる（Geminiの場合は無視する）。
+    json_schema を渡すとJSONモードで呼び出す（Geminiはスキーマまで指定、GroqはJSONオブジェクト指定のみ）。
     """
+    if deterministic:
+        temperature = 0
+        sampling = {"top_p": 1.0}
+        gemini_sampling = {"top_p": 1.0, "top_k": 1}
+    else:
+        sampling = {}
+        gemini_sampling = {}
     
-    # APIキーからバックエンドを自動判定（安全策）
-    backend = AI_BACKEND
-    if api_key:
-        if api_key.startswith("gsk_"):
-            backend = "groq"
-        elif api_key.startswith("AIza"):
-            backend = "gemini"
+    backend = _resolve_backend(api_key)
+
+    cache_path = None
+    if cache and temperature <= RESPONSE_CACHE_MAX_TEMPERATURE:
+        cache_path = _response_cache_path(
+            backend, system_prompt, user_prompt, temperature, max_tokens, deterministic,
+            model=_resolved_model(backend, api_key, groq_model)
+        )
+        cached = _read_response_cache(cache_path)
+        if cached is not None:
+            print("♻️ API Call: キャッシュ済みの応答を使用します")
+            if on_token:
+                on_token(cached)
+            return cached, None
             
     for attempt in range(max_retries):
         if backend == "groq":
             if attempt == 0:
                 print(f"🤖 API Call: Groq (Key: {api_key[:4]}...)")
             groq_key = api_key if api_key else GROQ_API_KEY
-            result, error = generate_content_groq(groq_key, system_prompt, user_prompt, temperature)
+            result, error = generate_content_groq(groq_key, system_prompt, user_prompt, temperature, on_token=on_token, max_tokens=max_tokens, model=groq_model, json_mode=bool(json_schema), **sampling)
         else:
             key_to_use = api_key if api_key else GOOGLE_API_KEY
             if attempt == 0:
                 print(f"🤖 API Call: Gemini (Key: {key_to_use[:4]}...)")
-            result, error = generate_content_gemini(key_to_use, system_prompt, user_prompt, temperature)
+            result, error = generate_content_gemini(key_to_use, system_prompt, user_prompt, temperature, on_token=on_token, max_tokens=max_tokens, json_schema=json_schema, **gemini_sampling)
             
         if not error:
+            if cache_path:
+                _write_response_cache(cache_path, result)
             return result, None
             
         # 429エラーなどの場合、少し待ってからリトライ
@@ -259,25 +699,127 @@ def generate_content_api(api_key, system_prompt, user_prompt, temperature=0.7, m
 # 記事構成の生成
 # ==========================================
 
-def generate_article_outline(keyword, research_data, api_key, custom_sources_text="", target_product=""):
+# 構成案のJSONスキーマ（GeminiのresponseSchemaに渡す。OpenAPIのサブセット形式）
+OUTLINE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "meta_description": {"type": "STRING"},
+        "outline": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "h2": {"type": "STRING"},
+                    "h3_list": {"type": "ARRAY", "items": {"type": "STRING"}},
+                },
+                "required": ["h2", "h3_list"],
+            },
+        },
+        "target_audience": {"type": "STRING"},
+        "main_keyword": {"type": "STRING"},
+    },
+    "required": ["title", "meta_description", "outline"],
+}
+
+# AI応答から最初の { 〜 最後の } までを取り出す（```json などの囲みを除去）
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+# 最後のカンマ（,）の後に閉じ括弧が来るパターン
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+# 表記ゆれのあるキーワードで構成案を使い回すためのキャッシュ
+# {入力のハッシュ: (保存時刻, 構成案)}（古い順）
+_OUTLINE_CACHE = collections.OrderedDict()
+_outline_cache_lock = threading.Lock()
+
+
+def normalize_keyword(keyword):
+    """
+    キーワードの表記ゆれを吸収したキャッシュ用のキーを返す。
+    全角/半角（NFKC）・大文字/小文字・空白の種類と数の違いを同一視する（語順・繰り返しは区別する）。
+    """
+    return " ".join(unicodedata.normalize("NFKC", keyword).lower().split())
+
+
+def _outline_cache_key(keyword, api_key, existing_headings, custom_sources_text, product_info, target_product):
+    """
+    構成案の出来上がりに影響する入力から作るキャッシュキー。
+    キーワードだけは正規化して、表記ゆれの違いでは別のキーにならないようにする。
+    """
+    backend = _resolve_backend(api_key)
+    model = _resolved_model(backend, api_key, GROQ_MODEL_OUTLINE)
+    return hashlib.sha256(json.dumps({
+        "keyword": normalize_keyword(keyword),
+        "headings": existing_headings,
+        "sources": custom_sources_text,
+        "product_info": product_info,
+        "target_product": target_product,
+        "backend": backend,
+        "model": model,
+    }, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _get_cached_outline(key):
+    with _outline_cache_lock:
+        entry = _OUTLINE_CACHE.get(key)
+        if entry:
+            if time.time() - entry[0] < RESPONSE_CACHE_TTL:
+                _OUTLINE_CACHE.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            del _OUTLINE_CACHE[key]
+    return None
+
+
+def _store_cached_outline(key, outline_data):
+    """構成案をLRUに載せる（古いものから OUTLINE_CACHE_SIZE 件を超えた分を捨てる）"""
+    with _outline_cache_lock:
+        _OUTLINE_CACHE[key] = (time.time(), copy.deepcopy(outline_data))
+        _OUTLINE_CACHE.move_to_end(key)
+        while len(_OUTLINE_CACHE) > OUTLINE_CACHE_SIZE:
+            _OUTLINE_CACHE.popitem(last=False)
+
+def generate_article_outline(keyword, research_data, api_key, custom_sources_text="", target_product="", use_cache=True, deterministic=False):
     """
     記事の構成案（見出し構造）を先に生成する。
     これにより、記事全体の流れを制御しやすくする。
+
+    use_cache=True の場合、表記ゆれだけが違うキーワード（全角スペース・大文字小文字など）で
+    その他の入力（リサーチ結果・独自ソース・商品情報・モデル）が同じ構成案を
+    RESPONSE_CACHE_TTL 内に作っていればそれを返す。use_cache=False の場合はキャッシュを使わずに作り直す
+    （作り直した構成案はキャッシュに上書きする）。
+    deterministic=True の場合は generate_content_api を決定的な設定で呼ぶ
+    （この場合は表記ゆれのキャッシュを使わない）。
     """
     current_api_key = api_key if api_key else (GROQ_API_KEY if AI_BACKEND == "groq" else GOOGLE_API_KEY)
-    product_info = load_product_info()
+    product_info = load_product_info(PRODUCT_INFO_OUTLINE_CHARS)
 
     # リサーチで取得した見出しを参考データとして追加
     existing_headings = ""
     if research_data and research_data.get("combined_headings"):
         headings_list = research_data["combined_headings"][:30]
         existing_headings = "\n".join(headings_list)
+
+    cache_key = None
+    if not deterministic:
+        cache_key = _outline_cache_key(
+            keyword, current_api_key, existing_headings, custom_sources_text, product_info, target_product
+        )
+        cached = _get_cached_outline(cache_key) if use_cache else None
+        if cached is not None:
+            print(f"♻️ 構成案: 「{keyword}」は作成済みの構成案を使用します")
+            return cached, None
         
     # 独自ソースから関連情報を抽出（トークン節約＆構成案への反映）
     relevant_custom_info = extract_relevant_info(keyword, custom_sources_text, max_chars=3000)
 
     # configのプロンプトを使用
-    system_prompt = prompts.OUTLINE_SYSTEM_PROMPT
+    # 商品情報はキーワードによらず同じなので、システムプロンプト側（プロンプトの先頭）に置く。
+    # 先頭が毎回一致していると、Gemini / Groq 側のプレフィックスキャッシュが効きやすい。
+    system_prompt = f"""{prompts.OUTLINE_SYSTEM_PROMPT}
+## 取り扱い商品情報
+{product_info}
+"""
 
     user_prompt = f"""## ターゲットキーワード
 {keyword}
@@ -287,9 +829,6 @@ def generate_article_outline(keyword, research_data, api_key, custom_sources_tex
 
 ## 独自ソース（今回書きたい内容の最重要ベース情報）
 {relevant_custom_info}
-
-## 取り扱い商品情報
-{product_info[:3000]}
 """
 
     if target_product:
@@ -297,21 +836,29 @@ def generate_article_outline(keyword, research_data, api_key, custom_sources_tex
 
     user_prompt += "\n## 出力形式\nJSONのみ出力してください。各H2の中にH3を必ず入れてください。\n"
 
-    result, error = generate_content_api(current_api_key, system_prompt, user_prompt, temperature=0.6)
+    result, error = generate_content_api(
+        current_api_key, system_prompt, user_prompt, temperature=0.6,
+        max_tokens=OUTLINE_MAX_TOKENS, deterministic=deterministic, groq_model=GROQ_MODEL_OUTLINE,
+        json_schema=OUTLINE_SCHEMA, cache=use_cache
+    )
 
     if error:
         return None, error
 
     try:
-        # JSON部分を抽出
-        cleaned = result.replace("```json", "").replace("```", "").strip()
+        # JSONモードなら応答はそのままJSONだが、JSONモードを使えないモデル（v1 など）やキャッシュ済みの旧形式の応答にも備えて抽出・修復は残す
+        match = _JSON_OBJECT_RE.search(result)
+        cleaned = match.group(0) if match else result.strip()
         
         # サニタイズ: 最後のカンマ（,）の後に閉じ括弧が来るパターン（LLMの常見ミス）を自己修復
-        cleaned = re.sub(r',\s*([\]}])', r'\1', cleaned)
+        cleaned = _TRAILING_COMMA_RE.sub(r'\1', cleaned)
         # 制御文字の除去
-        cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
+        cleaned = _CONTROL_CHARS_RE.sub('', cleaned)
         
-        outline_data = json.loads(cleaned)
+        # orjson.JSONDecodeError は json.JSONDecodeError のサブクラス
+        outline_data = _json_loads(cleaned)
+        if cache_key:
+            _store_cached_outline(cache_key, outline_data)
         return outline_data, None
     except json.JSONDecodeError as e:
         print(f"⚠ JSON自己修復を試みましたが失敗しました: {e}")
@@ -319,27 +866,60 @@ def generate_article_outline(keyword, research_data, api_key, custom_sources_tex
         try:
              import ast
              outline_data = ast.literal_eval(cleaned)
+             if cache_key:
+                 _store_cached_outline(cache_key, outline_data)
              return outline_data, None
         except Exception as eval_e:
              return None, f"構成案のJSON解析に完全に失敗しました: {e}\n生データ: {result[:500]}"
 
 
-def extract_relevant_info(query, text, max_chars=4000):
+# クエリを単語に分ける区切り文字
+_QUERY_SPLIT_RE = re.compile(r'[\s、。！？,.\-「」『』()（）]+')
+_NEWLINES_RE = re.compile(r'\n+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 重複判定に使う文字n-gramの長さと、重複とみなす重なりの割合
+_SHINGLE_SIZE = 5
+_DUPLICATE_OVERLAP = 0.8
+
+
+def _shingles(paragraph):
+    """段落を正規化して文字n-gramの集合にする（ほぼ同じ文章の検出用）"""
+    normalized = _WHITESPACE_RE.sub("", unicodedata.normalize("NFKC", paragraph))
+    if len(normalized) <= _SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1)}
+
+
+def _is_duplicate(shingles, seen):
+    """すでに採用した段落のどれかとほぼ同じ内容ならTrue"""
+    for other in seen:
+        overlap = len(shingles & other)
+        if overlap and overlap >= _DUPLICATE_OVERLAP * min(len(shingles), len(other)):
+            return True
+    return False
+
+
+def extract_relevant_info(query, text, max_chars=4000, seen=None):
     """
     指定されたクエリ（見出しなど）に関連する段落だけをテキスト全体から抽出する。
     これにより、LLMに不要なノイズを与えず、トークン数の節約と精度の向上を図る。
+
+    ほぼ同じ内容の段落（複数サイトの定型文など）は1つだけ残す。
+    seen にリストを渡すと採用した段落をそこに記録し、同じ seen を渡した別のテキストからは
+    既出の内容を除く（独自ソースとWeb参考情報で同じ文章を二重に送らないため）。
     """
     if not text or not query:
         return text[:max_chars] if text else "(情報なし)"
         
     # 日本語のクエリから重要そうな単語を抽出（記号で分割し、2文字以上を対象）
-    words = [w for w in re.split(r'[\s、。！？,.\-「」『』()（）]+', query) if len(w) >= 2]
+    words = [w for w in _QUERY_SPLIT_RE.split(query) if len(w) >= 2]
     if not words:
         return text[:max_chars]
         
     # 古い実装: paragraphs = text.split('\n\n') は改行1個の段落を捉えられない
     # 新しい実装: 1個以上の改行で確実に分割する
-    paragraphs = re.split(r'\n+', text)
+    paragraphs = _NEWLINES_RE.split(text)
     scored_paragraphs = []
     
     for i, p in enumerate(paragraphs):
@@ -361,6 +941,8 @@ def extract_relevant_info(query, text, max_chars=4000):
     # スコアの高い順にソート
     scored_paragraphs.sort(key=lambda x: x[0], reverse=True)
     
+    if seen is None:
+        seen = []
     top_paragraphs = []
     current_len = 0
     for score, i, p in scored_paragraphs:
@@ -369,6 +951,11 @@ def extract_relevant_info(query, text, max_chars=4000):
         # 全く関連しない（score=0）段落は、すでにある程度データが集まっていれば捨てる
         if score == 0 and current_len > max_chars / 2:
             break
+        # 既出とほぼ同じ段落は送らない（文字数の枠も消費しない）
+        shingles = _shingles(p)
+        if _is_duplicate(shingles, seen):
+            continue
+        seen.append(shingles)
             
         top_paragraphs.append((i, p))
         current_len += len(p) + 2
@@ -387,13 +974,35 @@ def extract_relevant_info(query, text, max_chars=4000):
 # 記事本文の生成
 # ==========================================
 
-def generate_article_body(keyword, outline_data, research_data, api_key, custom_sources_text="", progress_callback=None, target_product=""):
+def _clean_html_chunk(text):
+    """AIが付けがちなコードブロック記法（```html ... ```）を取り除く"""
+    html_chunk = text.strip()
+    if html_chunk.startswith("```html"):
+        html_chunk = html_chunk[7:]
+    if html_chunk.startswith("```"):
+        html_chunk = html_chunk[3:]
+    if html_chunk.endswith("```"):
+        html_chunk = html_chunk[:-3]
+    return html_chunk.strip()
+
+
+def generate_article_body(keyword, outline_data, research_data, api_key, custom_sources_text="", progress_callback=None, target_product="", html_callback=None, deterministic=False, use_cache=True):
     """
     構成案に基づいてSEOブログ記事の本文を生成する。
     【Ver2.0】見出し（H2）ごとに個別にAIを呼び出し、内容を限界まで濃く・深くする方式に変更。
+    各章のプロンプトは前後の章の本文に依存しないため、API呼び出しは並列に行い、結果は章の順番に連結する。
+
+    html_callback を渡すと、章が書き上がるたびにそこまでの本文HTMLを渡して呼び出す
+    （UIで記事を少しずつ表示するため）。この場合はAPIをストリーミングで呼び出し、
+    執筆中の章も DRAFT_REFRESH_INTERVAL 秒ごとに書きかけのHTMLを付けて呼び出す。
+    コールバックはいずれも呼び出し元のスレッドから呼ばれる（Streamlitの描画はワーカースレッドから行えないため）。
+    deterministic=True の場合は generate_content_api を決定的な設定で呼ぶ。
+    use_cache=False の場合は応答キャッシュを使わない。
     """
+    import affiliate_manager
+
     current_api_key = api_key if api_key else (GROQ_API_KEY if AI_BACKEND == "groq" else GOOGLE_API_KEY)
-    product_info = load_product_info()
+    product_info = load_product_info(PRODUCT_INFO_BODY_CHARS)
 
     # リサーチデータ全体と独自ソース全体を保持（ここではまだ切り詰めない）
     full_source_data = ""
@@ -402,10 +1011,16 @@ def generate_article_body(keyword, outline_data, research_data, api_key, custom_
         
     full_custom_sources = custom_sources_text if custom_sources_text else ""
 
-    full_article_html = ""
-    
-    # 構成案の見出し（H2）ごとにループして生成
+    # システムプロンプトは全章で共通なので1回だけ組み立てる
+    # （全章のリクエストが同じ先頭部分を持つので、API側のプレフィックスキャッシュにも乗りやすい）
+    system_prompt = prompts.BODY_SYSTEM_PROMPT.format(
+        affiliate_list_prompt=affiliate_manager.format_affiliate_list_for_prompt(),
+        product_info=product_info
+    )
+
+    # 構成案の見出し（H2）ごとに章専用のプロンプトを作成
     sections = outline_data.get("outline", [])
+    user_prompts = []
     
     for index, section in enumerate(sections):
         h2_title = section['h2']
@@ -426,17 +1041,10 @@ def generate_article_body(keyword, outline_data, research_data, api_key, custom_
 
         # スマート抽出（RAG風）：このH2/H3に関連する情報だけを抽出
         query_text = f"{keyword} {h2_title} " + " ".join(h3_list)
-        section_custom_sources = extract_relevant_info(query_text, full_custom_sources, max_chars=3000)
-        section_web_sources = extract_relevant_info(query_text, full_source_data, max_chars=4000)
-
-        # プロンプトを専用ファイルから読み込み
-        import affiliate_manager
-        affiliate_list_prompt = affiliate_manager.format_affiliate_list_for_prompt()
-        
-        system_prompt = prompts.BODY_SYSTEM_PROMPT.format(
-            affiliate_list_prompt=affiliate_list_prompt,
-            product_info=product_info[:2000]
-        )
+        # 独自ソースに既にある内容はWeb参考情報から除く
+        seen_paragraphs = []
+        section_custom_sources = extract_relevant_info(query_text, full_custom_sources, max_chars=3000, seen=seen_paragraphs)
+        section_web_sources = extract_relevant_info(query_text, full_source_data, max_chars=4000, seen=seen_paragraphs)
 
         user_prompt = prompts.BODY_USER_PROMPT_TEMPLATE.format(
             keyword=keyword,
@@ -449,49 +1057,140 @@ def generate_article_body(keyword, outline_data, research_data, api_key, custom_
         
         if target_product:
             user_prompt += f"\n\n※特に、今回は「{target_product}」を読者に自然に紹介・おすすめすることを意識してください。"
-        
-        # API呼び出し（進捗がわかるようにprint & callback）
-        msg = f"✍️ 第{index+1}章を執筆中 ({index+1}/{len(sections)}): {h2_title[:15]}..."
-        print(f"  └ {msg}")
-        if progress_callback:
-            progress_callback(msg)
-            
-        result, error = generate_content_api(current_api_key, system_prompt, user_prompt, temperature=0.7)
-        
-        if error:
-            print(f"    ⚠ この章の生成でエラー発生: {error}")
-            full_article_html += f"<h2>{h2_title}</h2>\n<p>※生成エラーにより本文をスキップしました。</p>\n\n"
-            continue
-            
-        # HTMLの整形（不要なマークダウン記法の除去）
-        html_chunk = result.strip()
-        if html_chunk.startswith("```html"):
-            html_chunk = html_chunk[7:]
-        if html_chunk.startswith("```"):
-            html_chunk = html_chunk[3:]
-        if html_chunk.endswith("```"):
-            html_chunk = html_chunk[:-3]
-            
-        full_article_html += html_chunk.strip() + "\n\n"
+
+        user_prompts.append(user_prompt)
+
+    if not sections:
+        return None, "すべての章の生成に失敗しました"
+
+    full_article_html = ""
+
+    # html_callback がある時はストリーミングで受信し、書きかけの章も途中まで表示する
+    # （ワーカースレッドは章ごとのバッファに追記するだけで、描画は呼び出し元のスレッドで行う）
+    section_buffers = [[] for _ in sections]
+
+    # 全章を同時に投げ、書き上がりは章の順番に受け取る
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(len(sections), BODY_SECTION_WORKERS))
+    try:
+        futures = [
+            executor.submit(
+                generate_content_api, current_api_key, system_prompt, user_prompt, 0.7,
+                max_tokens=SECTION_MAX_TOKENS, deterministic=deterministic, groq_model=GROQ_MODEL_BODY,
+                on_token=buffer.append if html_callback else None, cache=use_cache
+            )
+            for user_prompt, buffer in zip(user_prompts, section_buffers)
+        ]
+
+        for index, (section, future) in enumerate(zip(sections, futures)):
+            h2_title = section['h2']
+
+            # 進捗がわかるようにprint & callback
+            msg = f"✍️ 第{index+1}章を執筆中 ({index+1}/{len(sections)}): {h2_title[:15]}..."
+            print(f"  └ {msg}")
+            if progress_callback:
+                progress_callback(msg)
+
+            try:
+                while True:
+                    try:
+                        result, error = future.result(timeout=DRAFT_REFRESH_INTERVAL)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if html_callback and section_buffers[index]:
+                            partial_html = _clean_html_chunk("".join(section_buffers[index]))
+                            html_callback(full_article_html + partial_html)
+            except Exception as e:
+                result, error = None, f"API Exception: {e}"
+
+            if error:
+                print(f"    ⚠ この章の生成でエラー発生: {error}")
+                full_article_html += f"<h2>{h2_title}</h2>\n<p>{SECTION_SKIPPED_NOTE}</p>\n\n"
+            else:
+                # HTMLの整形（不要なマークダウン記法の除去）
+                full_article_html += _clean_html_chunk(result) + "\n\n"
+
+            if html_callback:
+                html_callback(full_article_html)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if not full_article_html.strip():
          return None, "すべての章の生成に失敗しました"
          
     # ▼【自動化】AIが出力した [AFF_LINK: 商品名] を、実際のアフィリエイトタグに完全自動置換する
-    import affiliate_manager
     full_article_html = affiliate_manager.replace_affiliate_placeholders(full_article_html)
          
     return full_article_html, None
 
 
+# {入力のハッシュ: (保存時刻, 本文HTML)}（古い順）
+_BODY_CACHE = collections.OrderedDict()
+_body_cache_lock = threading.Lock()
+
+
+def _body_cache_key(keyword, outline_data, research_data, api_key, custom_sources_text, target_product):
+    """本文の出来上がりに影響する入力（アフィリエイトリンクを含む）から作るキャッシュキー"""
+    import affiliate_manager
+    return hashlib.sha256(json.dumps({
+        "keyword": keyword,
+        "outline": outline_data,
+        "research": research_data,
+        "sources": custom_sources_text,
+        "target_product": target_product,
+        "affiliate": affiliate_manager.load_affiliate_links(),
+        "api_key": _api_key_digest(api_key or ""),
+    }, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def generate_article_body_cached(keyword, outline_data, research_data, api_key, custom_sources_text="", progress_callback=None, target_product="", html_callback=None, use_cache=True):
+    """
+    generate_article_body() のキャッシュ付き版（戻り値は同じ (html, error)）。
+    同じ入力で BODY_CACHE_TTL 内に生成した本文があればAPIを呼ばずに返す（この場合コールバックは呼ばれない）。
+    キャッシュを引くのは生成の前後だけで、コールバックはキャッシュの外で通常どおり呼ばれる。
+    エラーや一部の章が失敗した本文はキャッシュしない。
+    use_cache=False の場合はキャッシュを使わずに生成し直す（生成し直した本文はキャッシュに上書きする）。
+    """
+    key = _body_cache_key(keyword, outline_data, research_data, api_key, custom_sources_text, target_product)
+    with _body_cache_lock:
+        entry = _BODY_CACHE.get(key) if use_cache else None
+        if entry:
+            if time.time() - entry[0] < BODY_CACHE_TTL:
+                _BODY_CACHE.move_to_end(key)
+                print(f"♻️ 本文: 「{keyword}」は生成済みの本文を使用します")
+                return entry[1], None
+            del _BODY_CACHE[key]
+
+    article_html, error = generate_article_body(
+        keyword, outline_data, research_data, api_key,
+        custom_sources_text=custom_sources_text,
+        progress_callback=progress_callback,
+        target_product=target_product,
+        html_callback=html_callback,
+        use_cache=use_cache
+    )
+    if error or SECTION_SKIPPED_NOTE in article_html:
+        return article_html, error
+
+    with _body_cache_lock:
+        _BODY_CACHE[key] = (time.time(), article_html)
+        _BODY_CACHE.move_to_end(key)
+        while len(_BODY_CACHE) > BODY_CACHE_SIZE:
+            _BODY_CACHE.popitem(last=False)
+    return article_html, None
+
+
 # ==========================================
 # 記事生成のメインフロー
 # ==========================================
 
-def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5):
+def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5, deterministic=False):
     """
     キーワードからSEOブログ記事を一気通貫で生成する。
 
+    deterministic=True にすると temperature=0 / topP=1 / topK=1 で生成し、同じ入力なら同じ記事になる
+    （応答キャッシュにも当たりやすい）。文章の多様性がなくなるため、新規の記事作成ではなく
+    同じ条件での再生成・動作確認用に使うこと。
+
     Returns:
         dict: {
             "keyword": str,
@@ -527,6 +1226,15 @@ def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5
         "error": None
     }
 
+    # Web情報収集（ネットワーク待ち）は独自ソースの読み込みと並行して先に走らせておく
+    research_future = None
+    if do_research:
+        research_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        research_future = research_executor.submit(
+            web_researcher.research_keyword, keyword, max_sources=max_sources
+        )
+        research_executor.shutdown(wait=False)
+
     # ステップ0: 独自ソースの読み込み
     print("\n📂 ステップ0: 独自ソース読み込み...")
     custom_sources_text = source_loader.get_all_sources_text(keyword)
@@ -536,17 +1244,20 @@ def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5
 
     # ステップ1: Web情報収集
     research_data = None
-    if do_research:
+    if research_future is not None:
         print("\n📊 ステップ1: Web情報収集...")
-        research_data = web_researcher.research_keyword(keyword, max_sources=max_sources)
-        result["research_data"] = research_data
+        research_data = research_future.result()
+        # 記事データには保存用に切り詰めたものを持たせ、全文は本文生成にだけ使う
+        result["research_data"] = trim_research_data(research_data)
         print(f"  → {research_data['source_count']}件のソースを取得")
     else:
         print("\n📊 ステップ1: Web情報収集（スキップ）")
 
     # ステップ2: 構成案の生成
     print("\n📋 ステップ2: 記事構成案を生成中...")
-    outline_data, outline_error = generate_article_outline(keyword, research_data, current_api_key)
+    outline_data, outline_error = generate_article_outline(
+        keyword, research_data, current_api_key, deterministic=deterministic
+    )
 
     if outline_error:
         result["error"] = f"構成案生成エラー: {outline_error}"
@@ -563,7 +1274,8 @@ def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5
     print("\n✍️ ステップ3: 記事本文を生成中...")
     article_html, body_error = generate_article_body(
         keyword, outline_data, research_data, current_api_key,
-        custom_sources_text=custom_sources_text
+        custom_sources_text=custom_sources_text,
+        deterministic=deterministic
     )
 
     if body_error:
@@ -578,139 +1290,270 @@ def generate_blog_article(keyword, api_key=None, do_research=True, max_sources=5
     return result
 
 
+def generate_blog_articles_batch(keywords, api_key=None, max_concurrency=None, save=True, on_result=None, **kwargs):
+    """
+    複数キーワードの記事をまとめて生成する。
+    1記事の中（調査 → 構成案 → 本文）は順番に進むが、キーワード同士は並行して処理する。
+
+    Args:
+        keywords: キーワードのリスト
+        max_concurrency: 同時に生成する記事数（省略時 BATCH_MAX_CONCURRENCY）
+        save: True なら生成できた記事から順に save_article_bundle で保存する
+        on_result: 1記事終わるごとに result を渡して呼ぶ（呼び出し元のスレッドから、終わった順に呼ばれる）
+        **kwargs: generate_blog_article にそのまま渡す（do_research, max_sources など）
+
+    Returns:
+        list: generate_blog_article の結果（keywords と同じ順番）
+    """
+    if not keywords:
+        return []
+
+    workers = min(len(keywords), max_concurrency or BATCH_MAX_CONCURRENCY)
+    results = [None] * len(keywords)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_index = {
+            executor.submit(generate_blog_article, keyword, api_key=api_key, **kwargs): index
+            for index, keyword in enumerate(keywords)
+        }
+        for future in concurrent.futures.as_completed(future_to_index):
+            index = future_to_index[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"keyword": keywords[index], "error": f"記事生成エラー: {e}"}
+
+            if save and not result.get("error"):
+                save_article_bundle(result)
+            results[index] = result
+            if on_result:
+                on_result(result)
+
+    return results
+
+
 # ==========================================
 # 記事の保存
 # ==========================================
 
-def save_article_html(article_data, filename=None):
-    """
-    生成した記事をHTMLファイルとして保存する。
-    WordPressにコピペ可能な形式。
-    """
-    if not filename:
-        # キーワードからファイル名を生成
-        safe_keyword = article_data["keyword"].replace(" ", "_").replace("　", "_")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{safe_keyword}.html"
+ARTICLES_INDEX_FILE = os.path.join(ARTICLES_DIR, "index.jsonl")
+
+# 保存時の書き込みバッファ（64KB）
+WRITE_BUFFER_SIZE = 1 << 16
+
+# 記事保存ディレクトリはimport時ではなく、最初の保存時に作成する
+_articles_dir_ready = False
+
+
+def _ensure_dir():
+    """記事保存ディレクトリが無ければ作成する（プロセス内で1回だけ）"""
+    global _articles_dir_ready
+    if not _articles_dir_ready:
+        os.makedirs(ARTICLES_DIR, exist_ok=True)
+        _articles_dir_ready = True
 
-    filepath = os.path.join(ARTICLES_DIR, filename)
 
-    # 完全なHTMLドキュメントとして保存（プレビュー用）
-    full_html = f"""<!DOCTYPE html>
+def _make_basename(article_data):
+    """キーワードと現在時刻から保存ファイル名のベース（拡張子なし）を作る"""
+    safe_keyword = article_data["keyword"].replace(" ", "_").replace("　", "_")
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{timestamp}_{safe_keyword}"
+
+
+# プレビュー用HTMLのCSS（記事ごとに変わらないので定数にしておく）
+_PREVIEW_CSS = """
+    body {
+        font-family: 'Hiragino Sans', 'Noto Sans JP', 'Meiryo', sans-serif;
+        max-width: 800px;
+        margin: 0 auto;
+        padding: 20px 30px;
+        line-height: 1.9;
+        color: #333;
+        background: #fafafa;
+    }
+    h1 {
+        font-size: 1.8em;
+        color: #1a1a1a;
+        border-bottom: 3px solid #2d7d46;
+        padding-bottom: 10px;
+        margin-bottom: 20px;
+    }
+    h2 {
+        font-size: 1.4em;
+        color: #2d7d46;
+        border-left: 4px solid #2d7d46;
+        padding-left: 12px;
+        margin-top: 40px;
+        margin-bottom: 15px;
+    }
+    h3 {
+        font-size: 1.15em;
+        color: #444;
+        margin-top: 25px;
+        margin-bottom: 10px;
+    }
+    p {
+        margin-bottom: 16px;
+        font-size: 16px;
+    }
+    ul, ol {
+        margin-bottom: 16px;
+        padding-left: 28px;
+    }
+    li {
+        margin-bottom: 6px;
+    }
+    strong {
+        color: #c0392b;
+    }
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 20px 0;
+    }
+    th, td {
+        border: 1px solid #ddd;
+        padding: 10px 14px;
+        text-align: left;
+    }
+    th {
+        background: #2d7d46;
+        color: white;
+    }
+    tr:nth-child(even) {
+        background: #f5f5f5;
+    }
+    .meta-info {
+        background: #e8f5e9;
+        padding: 15px 20px;
+        border-radius: 8px;
+        margin-bottom: 30px;
+        font-size: 14px;
+        color: #555;
+    }
+    .cta-box {
+        background: linear-gradient(135deg, #e8f5e9, #c8e6c9);
+        border: 2px solid #2d7d46;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 25px 0;
+        text-align: center;
+    }
+    .cta-box a {
+        color: #2d7d46;
+        font-weight: bold;
+        text-decoration: none;
+    }
+    blockquote {
+        border-left: 4px solid #2d7d46;
+        padding: 10px 20px;
+        background: #f9f9f9;
+        margin: 15px 0;
+        font-style: italic;
+    }
+"""
+
+# プレビュー用HTMLの雛形（import時に1回だけ組み立てる）
+_PREVIEW_HTML_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{article_data.get('title', '')}</title>
-    <meta name="description" content="{article_data.get('meta_description', '')}">
-    <style>
-        body {{
-            font-family: 'Hiragino Sans', 'Noto Sans JP', 'Meiryo', sans-serif;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px 30px;
-            line-height: 1.9;
-            color: #333;
-            background: #fafafa;
-        }}
-        h1 {{
-            font-size: 1.8em;
-            color: #1a1a1a;
-            border-bottom: 3px solid #2d7d46;
-            padding-bottom: 10px;
-            margin-bottom: 20px;
-        }}
-        h2 {{
-            font-size: 1.4em;
-            color: #2d7d46;
-            border-left: 4px solid #2d7d46;
-            padding-left: 12px;
-            margin-top: 40px;
-            margin-bottom: 15px;
-        }}
-        h3 {{
-            font-size: 1.15em;
-            color: #444;
-            margin-top: 25px;
-            margin-bottom: 10px;
-        }}
-        p {{
-            margin-bottom: 16px;
-            font-size: 16px;
-        }}
-        ul, ol {{
-            margin-bottom: 16px;
-            padding-left: 28px;
-        }}
-        li {{
-            margin-bottom: 6px;
-        }}
-        strong {{
-            color: #c0392b;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 10px 14px;
-            text-align: left;
-        }}
-        th {{
-            background: #2d7d46;
-            color: white;
-        }}
-        tr:nth-child(even) {{
-            background: #f5f5f5;
-        }}
-        .meta-info {{
-            background: #e8f5e9;
-            padding: 15px 20px;
-            border-radius: 8px;
-            margin-bottom: 30px;
-            font-size: 14px;
-            color: #555;
-        }}
-        .cta-box {{
-            background: linear-gradient(135deg, #e8f5e9, #c8e6c9);
-            border: 2px solid #2d7d46;
-            border-radius: 10px;
-            padding: 20px;
-            margin: 25px 0;
-            text-align: center;
-        }}
-        .cta-box a {{
-            color: #2d7d46;
-            font-weight: bold;
-            text-decoration: none;
-        }}
-        blockquote {{
-            border-left: 4px solid #2d7d46;
-            padding: 10px 20px;
-            background: #f9f9f9;
-            margin: 15px 0;
-            font-style: italic;
-        }}
-    </style>
+    <title>$title</title>
+    <meta name="description" content="$meta_description">
+    <style>$css    </style>
 </head>
 <body>
     <div class="meta-info">
-        <strong>キーワード:</strong> {article_data.get('keyword', '')}<br>
-        <strong>生成日時:</strong> {article_data.get('generated_at', '')}<br>
-        <strong>Meta Description:</strong> {article_data.get('meta_description', '')}
+        <strong>キーワード:</strong> $keyword<br>
+        <strong>生成日時:</strong> $generated_at<br>
+        <strong>Meta Description:</strong> $meta_description
     </div>
 
-    <h1>{article_data.get('title', '')}</h1>
+    <h1>$title</h1>
 
-    {article_data.get('article_html', '<p>記事の生成に失敗しました。</p>')}
+    $article_html
 </body>
-</html>"""
+</html>""")
+
+
+def _render_full_html(article_data):
+    """プレビュー用の完全なHTMLドキュメントを組み立てる"""
+    return _PREVIEW_HTML_TEMPLATE.substitute(
+        css=_PREVIEW_CSS,
+        title=article_data.get('title', ''),
+        meta_description=article_data.get('meta_description', ''),
+        keyword=article_data.get('keyword', ''),
+        generated_at=article_data.get('generated_at', ''),
+        article_html=article_data.get('article_html', '<p>記事の生成に失敗しました。</p>'),
+    )
+
+
+def trim_research_data(research_data):
+    """
+    保存用に、大きくなりがちなリサーチ本文を切り詰めたresearch_dataを返す。
+    元のdict（本文生成に使う全文）は変更しない。
+    """
+    if not research_data:
+        return research_data
+    rd = research_data.copy()
+    # 統合テキストを圧縮
+    if rd.get("combined_content") and len(rd["combined_content"]) > 5000:
+        rd["combined_content"] = rd["combined_content"][:5000] + "...(略)"
+    # ソースの詳細も圧縮（ソースのdictもコピーしてから書き換える）
+    if rd.get("sources"):
+        trimmed_sources = []
+        for s in rd["sources"]:
+            if s.get("content") and len(s["content"]) > 1000:
+                s = dict(s, content=s["content"][:1000] + "...(略)")
+            trimmed_sources.append(s)
+        rd["sources"] = trimmed_sources
+    return rd
+
+
+def _trim_for_json(article_data):
+    """JSON保存用に、research_dataをトリムしたコピーを返す（トリム済みならそのまま通る）"""
+    save_data = article_data.copy()
+    if save_data.get("research_data"):
+        save_data["research_data"] = trim_research_data(save_data["research_data"])
+    return save_data
+
+
+def _write_text(filepath, text):
+    """
+    テキストをファイルに書き込む。
+    先にまとめてUTF-8にエンコードし、バイナリで1回の write にする（テキストモードの逐次エンコードを避ける）。
+    """
+    _write_bytes(filepath, text.encode("utf-8"))
+
+
+def _write_bytes(filepath, data):
+    """バイト列をファイルに書き込む（記事1本分が1回の書き込みに収まるバッファサイズで開く）"""
+    with open(filepath, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(data)
+
+
+def _dump_json_bytes(data, indent=False):
+    """JSONをUTF-8のバイト列にする（日本語はエスケープしない）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def save_article_html(article_data, filename=None):
+    """
+    生成した記事をHTMLファイルとして保存する。
+    WordPressにコピペ可能な形式。
+    """
+    if not filename:
+        filename = f"{_make_basename(article_data)}.html"
+
+    filepath = os.path.join(ARTICLES_DIR, filename)
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(full_html)
+        _ensure_dir()
+        # 完全なHTMLドキュメントとして保存（プレビュー用）
+        _write_text(filepath, _render_full_html(article_data))
         print(f"💾 記事を保存しました: {filepath}")
         return filepath
     except Exception as e:
@@ -724,15 +1567,13 @@ def save_article_wp_content(article_data, filename=None):
     （<h2>〜のみ、<html>などは含まない）
     """
     if not filename:
-        safe_keyword = article_data["keyword"].replace(" ", "_").replace("　", "_")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{safe_keyword}_wp.html"
+        filename = f"{_make_basename(article_data)}_wp.html"
 
     filepath = os.path.join(ARTICLES_DIR, filename)
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(article_data.get("article_html", ""))
+        _ensure_dir()
+        _write_text(filepath, article_data.get("article_html", ""))
         print(f"💾 WP用記事を保存しました: {filepath}")
         return filepath
     except Exception as e:
@@ -743,29 +1584,16 @@ def save_article_wp_content(article_data, filename=None):
 def save_article_json(article_data, filename=None):
     """記事データ全体をJSONで保存する（バックアップ・管理用）"""
     if not filename:
-        safe_keyword = article_data["keyword"].replace(" ", "_").replace("　", "_")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{safe_keyword}.json"
+        filename = f"{_make_basename(article_data)}.json"
 
     filepath = os.path.join(ARTICLES_DIR, filename)
 
     # research_dataは大きすぎる場合があるのでトリム
-    save_data = article_data.copy()
-    if save_data.get("research_data"):
-        rd = save_data["research_data"].copy()
-        # 統合テキストを圧縮
-        if rd.get("combined_content") and len(rd["combined_content"]) > 5000:
-            rd["combined_content"] = rd["combined_content"][:5000] + "...(略)"
-        # ソースの詳細も圧縮
-        if rd.get("sources"):
-            for s in rd["sources"]:
-                if s.get("content") and len(s["content"]) > 1000:
-                    s["content"] = s["content"][:1000] + "...(略)"
-        save_data["research_data"] = rd
+    save_data = _trim_for_json(article_data)
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
+        _ensure_dir()
+        _write_bytes(filepath, _dump_json_bytes(save_data, indent=True))
         print(f"💾 JSONバックアップ保存: {filepath}")
         return filepath
     except Exception as e:
@@ -773,6 +1601,55 @@ def save_article_json(article_data, filename=None):
         return None
 
 
+def _append_article_index(json_filename, article_data):
+    """履歴一覧用のメタ情報を index.jsonl に1行追記する"""
+    entry = {
+        "json": json_filename,
+        "title": article_data.get("title", ""),
+        "keyword": article_data.get("keyword", ""),
+        "generated_at": article_data.get("generated_at", ""),
+        "wp_html": article_data.get("_paths", {}).get("wp_html"),
+    }
+    try:
+        with open(ARTICLES_INDEX_FILE, "ab") as f:
+            f.write(_dump_json_bytes(entry) + b"\n")
+    except Exception as e:
+        print(f"履歴インデックス追記エラー: {e}")
+
+
+def save_article_bundle(article_data):
+    """
+    プレビュー用HTML / WP用HTML / JSONバックアップの3ファイルをまとめて保存する。
+    ファイル名のベースを1回だけ決め、3つの書き込みを並列で行う。
+
+    Returns:
+        tuple: (html_path, wp_path, json_path) ※失敗したものは None
+    """
+    _ensure_dir()
+    base = _make_basename(article_data)
+    # 3ファイルの名前をJSON自体にも記録しておき、履歴表示でファイルを探さずに済むようにする
+    article_data["_paths"] = {
+        "html": f"{base}.html",
+        "wp_html": f"{base}_wp.html",
+        "json": f"{base}.json",
+    }
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        html_future = executor.submit(save_article_html, article_data, f"{base}.html")
+        wp_future = executor.submit(save_article_wp_content, article_data, f"{base}_wp.html")
+        json_future = executor.submit(save_article_json, article_data, f"{base}.json")
+        html_path = html_future.result()
+        wp_path = wp_future.result()
+        json_path = json_future.result()
+
+    if not wp_path:
+        article_data["_paths"]["wp_html"] = None
+
+    if json_path:
+        _append_article_index(os.path.basename(json_path), article_data)
+
+    return html_path, wp_path, json_path
+
+
 # テスト用
 if __name__ == "__main__":
     import sys
@@ -781,15 +1658,16 @@ if __name__ == "__main__":
     if not api_key:
         print("環境変数 GEMINI_API_KEY を設定してください")
         sys.exit(1)
+    config_api(api_key)
 
-    keyword = "フィンガーライム 育て方"
-    result = generate_blog_article(keyword, api_key=api_key)
+    # 引数でキーワードを複数渡すとまとめて生成する（例: python blog_generator.py "A 育て方" "B 剪定"）
+    keywords = sys.argv[1:] or ["フィンガーライム 育て方"]
 
-    if result["error"]:
-        print(f"エラー: {result['error']}")
-    else:
-        save_article_html(result)
-        save_article_wp_content(result)
-        save_article_json(result)
-        print(f"\n記事タイトル: {result['title']}")
-        print(f"文字数: {len(result['article_html'])}文字")
+    def print_result(result):
+        if result["error"]:
+            print(f"エラー（{result['keyword']}）: {result['error']}")
+        else:
+            print(f"\n記事タイトル: {result['title']}")
+            print(f"文字数: {len(result['article_html'])}文字")
+
+    generate_blog_articles_batch(keywords, api_key=api_key, on_result=print_result)
@@ -7,13 +7,16 @@ Google Sheetsを使って、ブログ記事のソース・Instagram投稿・記
 同じスプレッドシート内に別シートとして管理する。
 """
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import os
+import re
+import sys
 import json
 import datetime
+import threading
+import concurrent.futures
 
-import streamlit as st
+# gspread / oauth2client / streamlit は重いので、実際に接続するときに読み込む
+# （CLIから記事生成だけするときに数百msの起動コストを払わないため）
 
 # ==========================================
 # 設定
@@ -47,15 +50,70 @@ HEADERS_ARTICLES = [
     "記事HTML", "ソース数", "文字数", "生成日時", "ステータス"
 ]
 
+# 文字数カウント用にHTMLタグを取り除く
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 # ==========================================
 # 認証・接続
 # ==========================================
 
+# 認証済みクライアント・スプレッドシート・シートはプロセス内で使い回す
+# （操作のたびに認証とスプレッドシートのオープンをやり直さないため）
+_client = None
+_spreadsheet = None
+_worksheets = {}
+_connection_lock = threading.Lock()
+# gspread / oauth2client が入っていない環境では接続を試みない（警告も1回だけ出す）
+_libraries_missing = False
+
+
+def reset_connection():
+    """キャッシュした接続を捨てる（認証エラー時など。次の操作で接続し直す）"""
+    global _client, _spreadsheet
+    with _connection_lock:
+        _client = None
+        _spreadsheet = None
+        _worksheets.clear()
+
+
+def _handle_api_error(e):
+    """認証切れ・権限エラー（401/403）ならキャッシュした接続を捨てる"""
+    # gspreadがまだ読み込まれていなければ、gspreadの例外であるはずがない
+    gspread = sys.modules.get("gspread")
+    if gspread is not None and isinstance(e, gspread.exceptions.APIError):
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status in (401, 403):
+            reset_connection()
+
+
 def get_client():
+    """GCPサービスアカウントで認証する（成功したクライアントはキャッシュする）"""
+    global _client
+    if _client is None:
+        client = _create_client()
+        with _connection_lock:
+            if _client is None:
+                _client = client
+    return _client
+
+
+def _create_client():
     """GCPサービスアカウントで認証する（Streamlit Cloud / ローカル両対応）"""
+    global _libraries_missing
+    if _libraries_missing:
+        return None
+    try:
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+    except ImportError as e:
+        _libraries_missing = True
+        print(f"⚠ gspread / oauth2client が使えません: {e}")
+        return None
+
     # 1. Streamlit Cloud (Secrets) から読み込み
     try:
+        import streamlit as st
         if "gcp_service_account" in st.secrets:
             creds_dict = dict(st.secrets["gcp_service_account"])
             creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, SCOPE)
@@ -90,28 +148,44 @@ def get_client():
 
 
 def get_spreadsheet():
-    """スプレッドシートを取得する"""
+    """スプレッドシートを取得する（取得できたものはキャッシュする）"""
+    global _spreadsheet
+    if _spreadsheet is not None:
+        return _spreadsheet
     client = get_client()
     if not client:
         return None
     try:
-        return client.open_by_key(SHEET_ID)
+        spreadsheet = client.open_by_key(SHEET_ID)
     except Exception as e:
         print(f"スプレッドシート取得エラー: {e}")
+        _handle_api_error(e)
         return None
+    with _connection_lock:
+        if _spreadsheet is None:
+            _spreadsheet = spreadsheet
+    return _spreadsheet
 
 
 def get_or_create_sheet(sheet_name, headers):
     """
     指定名のシートを取得する。存在しない場合は新規作成する。
     """
+    worksheet = _worksheets.get(sheet_name)
+    if worksheet is not None:
+        return worksheet
+
     spreadsheet = get_spreadsheet()
     if not spreadsheet:
         return None
 
+    # スプレッドシートが取れている時点でgspreadは読み込み済み
+    import gspread
+
     try:
         # 既存シートを探す
         worksheet = spreadsheet.worksheet(sheet_name)
+        _worksheets[sheet_name] = worksheet
         return worksheet
     except gspread.exceptions.WorksheetNotFound:
         # シートが存在しない場合は作成
@@ -122,15 +196,76 @@ def get_or_create_sheet(sheet_name, headers):
             # ヘッダー行を追加
             worksheet.append_row(headers)
             print(f"✅ シート「{sheet_name}」を新規作成しました")
+            _worksheets[sheet_name] = worksheet
             return worksheet
         except Exception as e:
             print(f"シート作成エラー: {e}")
+            _handle_api_error(e)
             return None
     except Exception as e:
         print(f"シート取得エラー ({sheet_name}): {e}")
+        _handle_api_error(e)
         return None
 
 
+def _next_id(sheet):
+    """
+    次に使うIDを返す。
+    シート全体ではなくID列（A列）だけを取得し、最大値 + 1 にする
+    （行数 + 1 だと、途中の行を削除した後にIDが重複するため）。
+    """
+    ids = [int(v) for v in sheet.col_values(1)[1:] if str(v).isdigit()]
+    return max(ids, default=0) + 1
+
+
+def _find_row(sheet, record_id):
+    """ID列（A列）から指定IDの行番号を探す。見つからなければ None"""
+    cell = sheet.find(str(record_id), in_column=1)
+    return cell.row if cell else None
+
+
+def _get_columns(sheet_name, headers, names, error_label):
+    """
+    シートを get_all_values で1回取得し、指定した列を列ごとのリストにして返す。
+    get_all_records のように行ごとのdictを作らないので、行数が多い時に軽い。
+    取得に失敗した場合は各列とも空リストを返す。
+    """
+    columns = {name: [] for name in names}
+    sheet = get_or_create_sheet(sheet_name, headers)
+    if not sheet:
+        return columns
+    try:
+        values = sheet.get_all_values()
+    except Exception as e:
+        print(f"{error_label}: {e}")
+        _handle_api_error(e)
+        return columns
+    if len(values) < 2:
+        return columns
+
+    header, rows = values[0], values[1:]
+    for name in names:
+        if name not in header:
+            columns[name] = [""] * len(rows)
+            continue
+        index = header.index(name)
+        columns[name] = [row[index] if index < len(row) else "" for row in rows]
+    return columns
+
+
+def _count_rows(sheet_name, headers, error_label):
+    """ID列（A列）だけを取得してデータ行数を数える"""
+    sheet = get_or_create_sheet(sheet_name, headers)
+    if not sheet:
+        return 0
+    try:
+        return sum(1 for v in sheet.col_values(1)[1:] if v)
+    except Exception as e:
+        print(f"{error_label}: {e}")
+        _handle_api_error(e)
+        return 0
+
+
 def is_connected():
     """Google Sheetsに接続できるか確認する"""
     try:
@@ -154,6 +289,7 @@ def get_all_sources():
         return records
     except Exception as e:
         print(f"ソース取得エラー: {e}")
+        _handle_api_error(e)
         return []
 
 
@@ -165,8 +301,7 @@ def add_source(filename, file_type, content):
 
     try:
         # 次のIDを取得
-        records = sheet.get_all_records()
-        next_id = len(records) + 1
+        next_id = _next_id(sheet)
 
         # 内容が長すぎる場合はトリム（セルの文字数制限対策）
         if len(content) > 45000:
@@ -185,6 +320,7 @@ def add_source(filename, file_type, content):
         return True
     except Exception as e:
         print(f"ソース保存エラー: {e}")
+        _handle_api_error(e)
         return False
 
 
@@ -195,16 +331,15 @@ def delete_source(source_id):
         return False
 
     try:
-        records = sheet.get_all_records()
-        for i, record in enumerate(records):
-            if record.get("ID") == source_id:
-                # ヘッダー行(1) + データ行のインデックス(0始まり → +2)
-                sheet.delete_rows(i + 2)
-                print(f"✅ ソース削除: ID={source_id}")
-                return True
-        return False
+        row = _find_row(sheet, source_id)
+        if row is None:
+            return False
+        sheet.delete_rows(row)
+        print(f"✅ ソース削除: ID={source_id}")
+        return True
     except Exception as e:
         print(f"ソース削除エラー: {e}")
+        _handle_api_error(e)
         return False
 
 
@@ -213,15 +348,14 @@ def get_sources_text(keyword=""):
     全ソースの内容を統合テキストとして返す。
     キーワードが指定された場合はマッチするものを優先。
     """
-    sources = get_all_sources()
-    if not sources:
-        return ""
+    columns = _get_columns(
+        SHEET_NAME_SOURCES, HEADERS_SOURCES, ["ファイル名", "ファイル種類", "内容"], "ソース取得エラー"
+    )
 
     parts = []
-    for s in sources:
-        content = s.get("内容", "")
+    for filename, file_type, content in zip(columns["ファイル名"], columns["ファイル種類"], columns["内容"]):
         if content:
-            parts.append(f"【{s.get('ファイル種類', 'ファイル')}: {s.get('ファイル名', '')}】\n{content}")
+            parts.append(f"【{file_type or 'ファイル'}: {filename}】\n{content}")
 
     return "\n\n===\n\n".join(parts)
 
@@ -240,6 +374,7 @@ def get_all_instagram():
         return records
     except Exception as e:
         print(f"Instagram取得エラー: {e}")
+        _handle_api_error(e)
         return []
 
 
@@ -250,8 +385,7 @@ def add_instagram(account_name, caption, post_url="", tags=""):
         return False
 
     try:
-        records = sheet.get_all_records()
-        next_id = len(records) + 1
+        next_id = _next_id(sheet)
 
         row = [
             next_id,
@@ -266,6 +400,7 @@ def add_instagram(account_name, caption, post_url="", tags=""):
         return True
     except Exception as e:
         print(f"Instagram保存エラー: {e}")
+        _handle_api_error(e)
         return False
 
 
@@ -276,15 +411,15 @@ def delete_instagram(insta_id):
         return False
 
     try:
-        records = sheet.get_all_records()
-        for i, record in enumerate(records):
-            if record.get("ID") == insta_id:
-                sheet.delete_rows(i + 2)
-                print(f"✅ Instagram削除: ID={insta_id}")
-                return True
-        return False
+        row = _find_row(sheet, insta_id)
+        if row is None:
+            return False
+        sheet.delete_rows(row)
+        print(f"✅ Instagram削除: ID={insta_id}")
+        return True
     except Exception as e:
         print(f"Instagram削除エラー: {e}")
+        _handle_api_error(e)
         return False
 
 
@@ -292,27 +427,34 @@ def get_instagram_text(keyword=""):
     """
     Instagramソースの内容を統合テキストとして返す。
     """
-    sources = get_all_instagram()
-    if not sources:
+    columns = _get_columns(
+        SHEET_NAME_INSTAGRAM, HEADERS_INSTAGRAM, ["アカウント名", "キャプション", "投稿URL", "タグ"], "Instagram取得エラー"
+    )
+    accounts = columns["アカウント名"]
+    captions = columns["キャプション"]
+    urls = columns["投稿URL"]
+    tags = columns["タグ"]
+    if not accounts:
         return ""
 
-    relevant = []
-    for s in sources:
-        if not keyword:
-            relevant.append(s)
-        else:
-            search_text = (str(s.get("キャプション", "")) + str(s.get("タグ", ""))).lower()
-            if any(kw.lower() in search_text for kw in keyword.split()):
-                relevant.append(s)
+    # キーワードの小文字化は1回だけ行い、キャプション＋タグの列をそのまま走査する
+    keywords = [kw.lower() for kw in keyword.split()]
+    if keywords:
+        relevant = [
+            i for i, (caption, tag) in enumerate(zip(captions, tags))
+            if any(kw in (caption + tag).lower() for kw in keywords)
+        ]
+    else:
+        relevant = []
 
     if not relevant:
-        relevant = sources  # 関連なければ全部返す
+        relevant = range(len(accounts))  # 関連なければ全部返す
 
     parts = []
-    for s in relevant:
-        part = f"【Instagram @{s.get('アカウント名', '')}】\n{s.get('キャプション', '')}"
-        if s.get("投稿URL"):
-            part += f"\n(出典: {s['投稿URL']})"
+    for i in relevant:
+        part = f"【Instagram @{accounts[i]}】\n{captions[i]}"
+        if urls[i]:
+            part += f"\n(出典: {urls[i]})"
         parts.append(part)
 
     return "\n\n---\n\n".join(parts)
@@ -329,12 +471,10 @@ def save_article_record(article_data):
         return False
 
     try:
-        records = sheet.get_all_records()
-        next_id = len(records) + 1
+        next_id = _next_id(sheet)
 
-        import re
         article_html = article_data.get("article_html", "")
-        plain_text = re.sub(r'<[^>]+>', '', article_html)
+        plain_text = _TAG_RE.sub('', article_html)
 
         # 記事HTMLが長い場合はトリム
         html_to_save = article_html
@@ -357,6 +497,7 @@ def save_article_record(article_data):
         return True
     except Exception as e:
         print(f"記事保存エラー: {e}")
+        _handle_api_error(e)
         return False
 
 
@@ -370,6 +511,7 @@ def get_all_articles():
         return records
     except Exception as e:
         print(f"記事履歴取得エラー: {e}")
+        _handle_api_error(e)
         return []
 
 
@@ -384,13 +526,18 @@ def get_all_cloud_sources_text(keyword=""):
     """
     parts = []
 
+    # ファイルソースとInstagramソースは別シートなので、2つの取得を同時に行う
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        file_future = executor.submit(get_sources_text, keyword)
+        insta_future = executor.submit(get_instagram_text, keyword)
+        file_text = file_future.result()
+        insta_text = insta_future.result()
+
     # ファイルソース
-    file_text = get_sources_text(keyword)
     if file_text:
         parts.append("## ★ ファイルソース（独自情報）\n" + file_text)
 
     # Instagramソース
-    insta_text = get_instagram_text(keyword)
     if insta_text:
         parts.append("## ★ Instagramソース（専門家投稿）\n" + insta_text)
 
@@ -405,25 +552,39 @@ def get_all_cloud_sources_text(keyword=""):
 
 def get_cloud_source_summary():
     """クラウドソースの状況サマリーを返す"""
-    sources = get_all_sources()
-    insta = get_all_instagram()
-
-    text_count = sum(1 for s in sources if s.get("ファイル種類") == "text")
-    pdf_count = sum(1 for s in sources if s.get("ファイル種類") == "pdf")
-    excel_count = sum(1 for s in sources if s.get("ファイル種類") == "excel")
-    image_count = sum(1 for s in sources if s.get("ファイル種類") == "image")
+    # 件数だけ分かればよいので、本文（内容・キャプション）の列は取得しない
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        types_future = executor.submit(_get_file_types)
+        insta_future = executor.submit(
+            _count_rows, SHEET_NAME_INSTAGRAM, HEADERS_INSTAGRAM, "Instagram取得エラー"
+        )
+        file_types = types_future.result()
+        insta_count = insta_future.result()
 
     return {
-        "text_count": text_count,
-        "pdf_count": pdf_count,
-        "excel_count": excel_count,
-        "image_count": image_count,
-        "instagram_count": len(insta),
-        "total_file_count": len(sources),
-        "total_count": len(sources) + len(insta),
+        "text_count": file_types.count("text"),
+        "pdf_count": file_types.count("pdf"),
+        "excel_count": file_types.count("excel"),
+        "image_count": file_types.count("image"),
+        "instagram_count": insta_count,
+        "total_file_count": len(file_types),
+        "total_count": len(file_types) + insta_count,
     }
 
 
+def _get_file_types():
+    """ソースシートの「ファイル種類」列だけを取得する"""
+    sheet = get_or_create_sheet(SHEET_NAME_SOURCES, HEADERS_SOURCES)
+    if not sheet:
+        return []
+    try:
+        return sheet.col_values(HEADERS_SOURCES.index("ファイル種類") + 1)[1:]
+    except Exception as e:
+        print(f"ソース取得エラー: {e}")
+        _handle_api_error(e)
+        return []
+
+
 # テスト用
 if __name__ == "__main__":
     print("=== Blog Sheet Manager テスト ===")
@@ -8,17 +8,35 @@ PDF / Excel / テキスト / 画像 / インスタ貼り付け など
 """
 
 import os
+import re
 import json
+import time
+import hashlib
 import glob
+import codecs
+import importlib.util
+import threading
+import concurrent.futures
 from datetime import datetime
 
+# orjson があればソース一覧・キャッシュのJSON読み書きに使う（標準jsonより高速）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ==========================================
 # 設定
 # ==========================================
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SOURCES_DIR = os.path.join(BASE_DIR, "blog_data", "sources")
-INSTAGRAM_FILE = os.path.join(BASE_DIR, "blog_data", "instagram_sources.json")
+# Instagram / Webソースは1行1件のJSON Lines（追加は末尾に1行書くだけで済む）
+INSTAGRAM_FILE = os.path.join(BASE_DIR, "blog_data", "instagram_sources.jsonl")
+# 以前のJSON配列形式のファイル（初回読み込み時にJSON Linesへ移行する）
+LEGACY_INSTAGRAM_FILE = os.path.join(BASE_DIR, "blog_data", "instagram_sources.json")
+# PDF/Excelの抽出結果キャッシュ（sources/ の外に置き、テキストソースとして拾われないようにする）
+SOURCE_CACHE_DIR = os.path.join(BASE_DIR, "blog_data", "source_cache")
 
 # ソースフォルダがなければ作成
 os.makedirs(SOURCES_DIR, exist_ok=True)
@@ -29,6 +47,12 @@ PDF_EXTENSIONS = [".pdf"]
 EXCEL_EXTENSIONS = [".xlsx", ".xls"]
 IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
 
+# サイトクロール時の同時接続数（相手サイトに負荷をかけすぎない程度に）
+CRAWL_WORKERS = 5
+
+# ソースフォルダのファイルを同時に読み込む数（環境変数 LOAD_SOURCES_WORKERS で変更可）
+LOAD_SOURCES_WORKERS = int(os.environ.get("LOAD_SOURCES_WORKERS") or min(8, (os.cpu_count() or 1) + 4))
+
 # クラウドモード判定用（遅延import）
 _cloud_module = None
 
@@ -54,32 +78,102 @@ def _get_cloud():
     return None
 
 
+# ==========================================
+# JSONファイルの読み書き
+# ==========================================
+
+def _read_json(path):
+    """JSONファイルを読み込む"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def _dump_json_bytes(data, indent=False):
+    """JSONをUTF-8のバイト列にする（日本語はエスケープしない）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def _write_json(path, data, indent=False):
+    """JSONファイルを書き出す"""
+    with open(path, "wb") as f:
+        f.write(_dump_json_bytes(data, indent))
+
+
+def _source_filename(source):
+    """パス、またはファイルオブジェクト（StreamlitのUploadedFileなど）からファイル名を得る"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    return os.path.basename(getattr(source, "name", "") or "")
+
+
+def _rewind(source):
+    """ファイルオブジェクトなら先頭に戻して返す（パスはそのまま返す）"""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
 # ==========================================
 # テキストファイル読み込み
 # ==========================================
 
-def load_text_file(filepath, max_chars=50000):
-    """テキストファイルを読み込む"""
+TEXT_ENCODINGS = ["utf-8", "utf-8-sig", "cp932", "shift_jis", "euc-jp"]
+
+
+def _decode_text(raw, complete):
+    """
+    バイト列を TEXT_ENCODINGS の順に試してデコードする。
+    complete=False（ファイルの途中までしか読んでいない）の場合は、末尾で切れた文字を許容する。
+    どれでも読めなければ charset_normalizer（requests の依存で入っている）で推定する。
+    """
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return codecs.getincrementaldecoder(encoding)().decode(raw, final=complete)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
     try:
-        # いくつかのエンコーディングを試す
-        for encoding in ["utf-8", "utf-8-sig", "cp932", "shift_jis", "euc-jp"]:
-            try:
-                with open(filepath, "r", encoding=encoding) as f:
-                    content = f.read()
-                if content:
-                    if len(content) > max_chars:
-                        content = content[:max_chars] + "\n...(以下省略)"
-                    return {
-                        "type": "text",
-                        "filename": os.path.basename(filepath),
-                        "content": content,
-                        "char_count": len(content),
-                    }
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return None
+    best = from_bytes(raw).best()
+    if best is None:
         return None
+    return raw.decode(best.encoding, errors="replace")
+
+
+def load_text_file(filepath, max_chars=50000):
+    """テキストファイルを読み込む（filepath はパスでもファイルオブジェクトでもよい）"""
+    try:
+        # ファイルは1回だけ読み、エンコーディングの判定はメモリ上で行う。
+        # 1文字は最大4バイトなので、max_chars 文字を超えるのに十分な分だけ読めばよい
+        read_limit = max_chars * 4 + 8
+        if hasattr(filepath, "read"):
+            raw = _rewind(filepath).read(read_limit + 1)
+        else:
+            with open(filepath, "rb") as f:
+                raw = f.read(read_limit + 1)
+        complete = len(raw) <= read_limit
+        if not complete:
+            raw = raw[:read_limit]
+
+        content = _decode_text(raw, complete) if raw else None
+        if not content:
+            return None
+        if len(content) > max_chars:
+            content = content[:max_chars] + "\n...(以下省略)"
+        return {
+            "type": "text",
+            "filename": _source_filename(filepath),
+            "content": content,
+            "char_count": len(content),
+        }
     except Exception as e:
-        print(f"テキスト読み込みエラー ({filepath}): {e}")
+        print(f"テキスト読み込みエラー ({_source_filename(filepath)}): {e}")
         return None
 
 
@@ -87,8 +181,12 @@ def load_text_file(filepath, max_chars=50000):
 # PDF読み込み
 # ==========================================
 
-def load_pdf_file(filepath, max_chars=50000):
-    """PDFファイルからテキストを抽出する"""
+def load_pdf_file(filepath, max_chars=50000, include_tables=True):
+    """
+    PDFファイルからテキストを抽出する（filepath はパスでもファイルオブジェクトでもよい）。
+    max_chars に達した時点で残りのページは解析しない。
+    include_tables=False なら表の抽出（レイアウト解析が重い）を省略する。
+    """
     try:
         import pdfplumber
     except ImportError:
@@ -103,19 +201,27 @@ def load_pdf_file(filepath, max_chars=50000):
 
     try:
         text_parts = []
-        with pdfplumber.open(filepath) as pdf:
+        total_len = 0
+        with pdfplumber.open(_rewind(filepath)) as pdf:
             for i, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
                 if page_text:
                     text_parts.append(f"[ページ{i+1}]\n{page_text}")
+                    total_len += len(text_parts[-1]) + 2
 
                 # テーブルも抽出
-                tables = page.extract_tables()
-                for table in tables:
-                    if table:
-                        table_text = _format_table(table)
-                        if table_text:
-                            text_parts.append(f"[ページ{i+1} 表]\n{table_text}")
+                if include_tables and total_len < max_chars:
+                    tables = page.extract_tables()
+                    for table in tables:
+                        if table:
+                            table_text = _format_table(table)
+                            if table_text:
+                                text_parts.append(f"[ページ{i+1} 表]\n{table_text}")
+                                total_len += len(text_parts[-1]) + 2
+
+                # 上限に達したら、どうせ切り捨てる残りのページは読まない
+                if total_len >= max_chars:
+                    break
 
         content = "\n\n".join(text_parts)
         if len(content) > max_chars:
@@ -123,13 +229,13 @@ def load_pdf_file(filepath, max_chars=50000):
 
         return {
             "type": "pdf",
-            "filename": os.path.basename(filepath),
+            "filename": _source_filename(filepath),
             "content": content,
             "char_count": len(content),
             "page_count": len(text_parts),
         }
     except Exception as e:
-        print(f"PDF読み込みエラー ({filepath}): {e}")
+        print(f"PDF読み込みエラー ({_source_filename(filepath)}): {e}")
         return None
 
 
@@ -137,12 +243,16 @@ def _load_pdf_pypdf2(filepath, max_chars=50000):
     """PyPDF2でのフォールバック読み込み"""
     try:
         from PyPDF2 import PdfReader
-        reader = PdfReader(filepath)
+        reader = PdfReader(_rewind(filepath))
         text_parts = []
+        total_len = 0
         for i, page in enumerate(reader.pages):
             text = page.extract_text()
             if text:
                 text_parts.append(f"[ページ{i+1}]\n{text}")
+                total_len += len(text_parts[-1]) + 2
+            if total_len >= max_chars:
+                break
 
         content = "\n\n".join(text_parts)
         if len(content) > max_chars:
@@ -150,13 +260,13 @@ def _load_pdf_pypdf2(filepath, max_chars=50000):
 
         return {
             "type": "pdf",
-            "filename": os.path.basename(filepath),
+            "filename": _source_filename(filepath),
             "content": content,
             "char_count": len(content),
             "page_count": len(text_parts),
         }
     except Exception as e:
-        print(f"PyPDF2読み込みエラー ({filepath}): {e}")
+        print(f"PyPDF2読み込みエラー ({_source_filename(filepath)}): {e}")
         return None
 
 
@@ -177,7 +287,7 @@ def _format_table(table):
 # ==========================================
 
 def load_excel_file(filepath, max_chars=50000):
-    """Excelファイルからデータを抽出する"""
+    """Excelファイルからデータを抽出する（filepath はパスでもファイルオブジェクトでもよい）"""
     try:
         import openpyxl
     except ImportError:
@@ -185,23 +295,42 @@ def load_excel_file(filepath, max_chars=50000):
         return None
 
     try:
-        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
-        text_parts = []
-
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            sheet_lines = [f"【シート: {sheet_name}】"]
-
-            for row in ws.iter_rows(values_only=True):
-                cells = [str(cell).strip() if cell is not None else "" for cell in row]
-                # 空行はスキップ
-                if any(c for c in cells):
-                    sheet_lines.append(" | ".join(cells))
-
-            if len(sheet_lines) > 1:  # ヘッダだけじゃない場合
-                text_parts.append("\n".join(sheet_lines))
-
-        wb.close()
+        wb = openpyxl.load_workbook(_rewind(filepath), read_only=True, data_only=True)
+        # read_onlyモードはファイルを開いたままにするので、途中で例外が出ても必ず閉じる
+        try:
+            sheet_count = len(wb.sheetnames)
+            text_parts = []
+
+            # max_chars を超えるだけ読めたら、残りの行・シートは読まない
+            total_chars = 0
+
+            for sheet_name in wb.sheetnames:
+                if total_chars > max_chars:
+                    break
+                ws = wb[sheet_name]
+                sheet_lines = [f"【シート: {sheet_name}】"]
+
+                for row in ws.iter_rows(values_only=True):
+                    if total_chars > max_chars:
+                        break
+                    # 書式だけ残った空行などは、文字列化する前に飛ばす
+                    if all(cell is None for cell in row):
+                        continue
+                    # 文字列セルはそのまま、数値・日付などだけ str() する
+                    cells = [
+                        cell.strip() if isinstance(cell, str) else ("" if cell is None else str(cell))
+                        for cell in row
+                    ]
+                    # 空行はスキップ
+                    if any(cells):
+                        line = " | ".join(cells)
+                        sheet_lines.append(line)
+                        total_chars += len(line) + 1
+
+                if len(sheet_lines) > 1:  # ヘッダだけじゃない場合
+                    text_parts.append("\n".join(sheet_lines))
+        finally:
+            wb.close()
 
         content = "\n\n".join(text_parts)
         if len(content) > max_chars:
@@ -209,14 +338,116 @@ def load_excel_file(filepath, max_chars=50000):
 
         return {
             "type": "excel",
-            "filename": os.path.basename(filepath),
+            "filename": _source_filename(filepath),
             "content": content,
             "char_count": len(content),
-            "sheet_count": len(wb.sheetnames),
+            "sheet_count": sheet_count,
         }
     except Exception as e:
-        print(f"Excel読み込みエラー ({filepath}): {e}")
+        print(f"Excel読み込みエラー ({_source_filename(filepath)}): {e}")
+        return None
+
+
+# ==========================================
+# PDF / Excel 抽出結果のキャッシュ
+# ==========================================
+# PDF/Excelの解析は重いため、抽出結果をJSONとして保存し、
+# 元ファイルが更新されるまで（サイズ・更新日時が変わるまで）は再解析しない。
+# アップロード時はバックグラウンドのスレッドで先に抽出しておく。
+
+_extract_executor = None
+_pending_extracts = {}
+_extract_lock = threading.Lock()
+
+
+def _extract_cache_path(filepath):
+    """抽出結果キャッシュのパスを返す"""
+    return os.path.join(SOURCE_CACHE_DIR, os.path.basename(filepath) + ".json")
+
+
+def _file_fingerprint(filepath):
+    """ファイルの中身が変わったかどうかの目印（サイズ, 更新日時ns）"""
+    st = os.stat(filepath)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_extract_cache(filepath):
+    """元ファイルと同じサイズ・更新日時で作った抽出結果キャッシュがあれば返す"""
+    try:
+        cached = _read_json(_extract_cache_path(filepath))
+        if cached.get("fingerprint") == _file_fingerprint(filepath):
+            return cached.get("data")
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def _write_json_atomic(path, data):
+    """一時ファイルに書いてから置き換える（並行して読んでも書きかけが見えないように）"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    _write_json(tmp_path, data)
+    os.replace(tmp_path, path)
+
+
+def _write_extract_cache(filepath, data):
+    """抽出結果を、元ファイルの目印と一緒にキャッシュに保存する"""
+    try:
+        os.makedirs(SOURCE_CACHE_DIR, exist_ok=True)
+        _write_json_atomic(
+            _extract_cache_path(filepath),
+            {"fingerprint": _file_fingerprint(filepath), "data": data},
+        )
+    except Exception as e:
+        print(f"抽出キャッシュ保存エラー ({filepath}): {e}")
+
+
+def _extract_and_cache(filepath):
+    """PDF/Excelを解析し、結果をキャッシュに保存して返す"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in PDF_EXTENSIONS:
+        data = load_pdf_file(filepath)
+    elif ext in EXCEL_EXTENSIONS:
+        data = load_excel_file(filepath)
+    else:
         return None
+    if data:
+        _write_extract_cache(filepath, data)
+    return data
+
+
+def _load_with_cache(filepath):
+    """
+    PDF/Excelを読み込む。抽出済みキャッシュがあればそれを返し、
+    バックグラウンドで抽出中ならその完了を待つ（二重に解析しない）。
+    """
+    cached = _read_extract_cache(filepath)
+    if cached:
+        return cached
+
+    with _extract_lock:
+        future = _pending_extracts.get(filepath)
+    if future is not None:
+        return future.result()
+
+    return _extract_and_cache(filepath)
+
+
+def extract_in_background(filepath):
+    """PDF/Excelの抽出をバックグラウンドのスレッドで開始する"""
+    global _extract_executor
+    with _extract_lock:
+        if _extract_executor is None:
+            _extract_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        future = _extract_executor.submit(_extract_and_cache, filepath)
+        _pending_extracts[filepath] = future
+
+    def _done(f):
+        with _extract_lock:
+            if _pending_extracts.get(filepath) is f:
+                del _pending_extracts[filepath]
+
+    future.add_done_callback(_done)
+    return future
 
 
 # ==========================================
@@ -249,14 +480,85 @@ def load_image_info(filepath):
 # Instagram投稿ソースの管理
 # ==========================================
 
+# JSON Linesファイルの読み込み結果（ファイルが変わるまで使い回す）: {パス: (目印, リスト)}
+_json_list_cache = {}
+_json_list_lock = threading.Lock()
+
+
+def _migrate_legacy_json(path, legacy_path):
+    """JSON Linesファイルがまだなく、旧形式（JSON配列）のファイルがあれば変換する"""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return
+    data = _read_json(legacy_path)
+    _write_jsonl(path, data if isinstance(data, list) else [])
+    print(f"✅ {os.path.basename(legacy_path)} を {os.path.basename(path)} に移行しました")
+
+
+def _load_json_list(path, legacy_path=None):
+    """
+    JSON Linesファイルを読み込んでリストで返す（ファイルがなければ空リスト）。
+    サイズ・更新日時が前回と同じなら、ファイルを読み直さずに前回の結果を返す。
+    返すリストはコピーなので、呼び出し側で追加・削除してよい。
+    """
+    if legacy_path:
+        _migrate_legacy_json(path, legacy_path)
+    try:
+        fingerprint = _file_fingerprint(path)
+    except OSError:
+        return []
+    with _json_list_lock:
+        cached = _json_list_cache.get(path)
+    if cached and cached[0] == fingerprint:
+        return list(cached[1])
+
+    data = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                data.append(orjson.loads(line) if orjson is not None else json.loads(line))
+            except ValueError:
+                # 書き込み途中で止まった行などは読み飛ばす
+                print(f"⚠ 読み込めない行をスキップしました ({os.path.basename(path)})")
+    with _json_list_lock:
+        _json_list_cache[path] = (fingerprint, data)
+    return list(data)
+
+
+def _append_jsonl(path, entry):
+    """JSON Linesファイルの末尾に1件追加する（ファイル全体は書き直さない）"""
+    with _json_list_lock:
+        cached = _json_list_cache.get(path)
+        try:
+            before = _file_fingerprint(path)
+        except OSError:
+            before = None
+        line = _dump_json_bytes(entry) + b"\n"
+        with open(path, "a+b") as f:
+            # 前回の書き込みが途中で止まって改行で終わっていなければ、行を分けてから書く
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        # 読み込み済みの内容が最新だったなら、読み直さずに済むよう追記分だけ反映する
+        if cached and cached[0] == before:
+            _json_list_cache[path] = (_file_fingerprint(path), cached[1] + [entry])
+
+
+def _write_jsonl(path, entries):
+    """JSON Linesファイルを丸ごと書き直す（削除時など）"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(_dump_json_bytes(entry) + b"\n" for entry in entries))
+    os.replace(tmp_path, path)
+
+
 def load_instagram_sources():
     """保存済みのInstagram投稿ソースを読み込む"""
-    if not os.path.exists(INSTAGRAM_FILE):
-        return []
     try:
-        with open(INSTAGRAM_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, list) else []
+        return _load_json_list(INSTAGRAM_FILE, LEGACY_INSTAGRAM_FILE)
     except Exception as e:
         print(f"Instagramソース読み込みエラー: {e}")
         return []
@@ -265,7 +567,7 @@ def load_instagram_sources():
 def save_instagram_source(account_name, caption_text, post_url="", tags=""):
     """
     Instagram投稿のキャプションをソースとして保存する。
-    クラウド接続時はGoogle Sheetsに、ローカル時はJSONファイルに保存。
+    クラウド接続時はGoogle Sheetsに、ローカル時はJSON Linesファイルに追記する。
     """
     cloud = _get_cloud()
     if cloud:
@@ -275,8 +577,9 @@ def save_instagram_source(account_name, caption_text, post_url="", tags=""):
     # ローカル保存（フォールバック）
     sources = load_instagram_sources()
 
+    # IDは削除しても振り直さないので、件数ではなく最大値+1で採番する
     new_entry = {
-        "id": len(sources) + 1,
+        "id": max((s.get("id", 0) for s in sources if isinstance(s.get("id"), int)), default=0) + 1,
         "account_name": account_name.strip(),
         "caption": caption_text.strip(),
         "post_url": post_url.strip(),
@@ -284,11 +587,9 @@ def save_instagram_source(account_name, caption_text, post_url="", tags=""):
         "saved_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
     }
 
-    sources.append(new_entry)
-
     try:
-        with open(INSTAGRAM_FILE, "w", encoding="utf-8") as f:
-            json.dump(sources, f, ensure_ascii=False, indent=2)
+        os.makedirs(os.path.dirname(INSTAGRAM_FILE), exist_ok=True)
+        _append_jsonl(INSTAGRAM_FILE, new_entry)
         print(f"✅ Instagramソース保存: @{account_name} ({len(caption_text)}文字)")
         return True
     except Exception as e:
@@ -302,16 +603,13 @@ def delete_instagram_source(source_id):
     if cloud:
         return cloud.delete_instagram(source_id)
     
-    # ローカル削除
+    # ローカル削除（残ったソースのIDはそのまま。画面のウィジェットキーなどが変わらないように）
     sources = load_instagram_sources()
-    sources = [s for s in sources if s.get("id") != source_id]
-
-    for i, s in enumerate(sources):
-        s["id"] = i + 1
-
+    remaining = [s for s in sources if s.get("id") != source_id]
+    if len(remaining) == len(sources):
+        return True  # 該当なし（書き直す必要もない）
     try:
-        with open(INSTAGRAM_FILE, "w", encoding="utf-8") as f:
-            json.dump(sources, f, ensure_ascii=False, indent=2)
+        _write_jsonl(INSTAGRAM_FILE, remaining)
         return True
     except Exception:
         return False
@@ -326,14 +624,16 @@ def get_instagram_text_for_keyword(keyword=""):
     if not sources:
         return ""
 
-    relevant = []
-    for s in sources:
-        if not keyword:
-            relevant.append(s)
-        else:
+    if not keyword:
+        relevant = sources
+    else:
+        # キーワードの分割・小文字化はループの外で1回だけ行う
+        keywords = [kw.lower() for kw in keyword.split()]
+        relevant = []
+        for s in sources:
             # キーワードがタグやキャプションに含まれているか
             search_text = (s.get("caption", "") + s.get("tags", "")).lower()
-            if any(kw.lower() in search_text for kw in keyword.split()):
+            if any(kw in search_text for kw in keywords):
                 relevant.append(s)
 
     if not relevant:
@@ -354,6 +654,39 @@ def get_instagram_text_for_keyword(keyword=""):
 # フォルダ内ソースの一括読み込み
 # ==========================================
 
+# 種類ごとの結果リスト名と、統合テキストに付ける見出し
+_SOURCE_LABELS = {
+    "text_sources": "ファイル",
+    "pdf_sources": "PDF",
+    "excel_sources": "Excel",
+}
+
+
+def _load_source_file(filepath):
+    """拡張子に応じて1ファイルを読み込み、(結果リスト名, データ) を返す"""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in TEXT_EXTENSIONS:
+        return "text_sources", load_text_file(filepath)
+    if ext in PDF_EXTENSIONS:
+        return "pdf_sources", _load_with_cache(filepath)
+    if ext in EXCEL_EXTENSIONS:
+        return "excel_sources", _load_with_cache(filepath)
+    if ext in IMAGE_EXTENSIONS:
+        return "image_sources", load_image_info(filepath)
+    return None, None
+
+
+def _list_source_files(sources_dir):
+    """
+    読み込み対象のファイル（sources/ 直下のファイル。サブフォルダの中は読まない）を os.DirEntry で返す。
+    読み込み・件数集計・変更検知で同じファイル集合を見るように、ここに一本化する。
+    """
+    try:
+        return [entry for entry in os.scandir(sources_dir) if entry.is_file()]
+    except OSError:
+        return []
+
+
 def load_all_file_sources(sources_dir=None):
     """
     sources/ フォルダ内の全ファイルを読み込んで統合する。
@@ -380,43 +713,26 @@ def load_all_file_sources(sources_dir=None):
         "combined_text": "",
     }
 
-    if not os.path.exists(sources_dir):
+    all_files = [entry.path for entry in _list_source_files(sources_dir)]
+    if not all_files:
         return result
 
-    all_files = []
-    for f in os.listdir(sources_dir):
-        filepath = os.path.join(sources_dir, f)
-        if os.path.isfile(filepath):
-            all_files.append(filepath)
-
     text_parts = []
 
-    for filepath in sorted(all_files):
-        ext = os.path.splitext(filepath)[1].lower()
-
-        if ext in TEXT_EXTENSIONS:
-            data = load_text_file(filepath)
-            if data:
-                result["text_sources"].append(data)
-                text_parts.append(f"【ファイル: {data['filename']}】\n{data['content']}")
+    # ファイルごとの読み込み・解析は互いに独立なので並列に行う（結果はファイル名順のまま）
+    all_files.sort()
+    workers = max(1, min(LOAD_SOURCES_WORKERS, len(all_files)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        loaded = list(executor.map(_load_source_file, all_files))
 
-        elif ext in PDF_EXTENSIONS:
-            data = load_pdf_file(filepath)
-            if data:
-                result["pdf_sources"].append(data)
-                text_parts.append(f"【PDF: {data['filename']}】\n{data['content']}")
-
-        elif ext in EXCEL_EXTENSIONS:
-            data = load_excel_file(filepath)
-            if data:
-                result["excel_sources"].append(data)
-                text_parts.append(f"【Excel: {data['filename']}】\n{data['content']}")
-
-        elif ext in IMAGE_EXTENSIONS:
-            data = load_image_info(filepath)
-            if data:
-                result["image_sources"].append(data)
-                # 画像はテキストとしては追加しない（メタ情報のみ）
+    for kind, data in loaded:
+        if not data:
+            continue
+        result[kind].append(data)
+        # 画像はテキストとしては追加しない（メタ情報のみ）
+        label = _SOURCE_LABELS.get(kind)
+        if label:
+            text_parts.append(f"【{label}: {data['filename']}】\n{data['content']}")
 
     result["total_count"] = (
         len(result["text_sources"]) +
@@ -430,15 +746,63 @@ def load_all_file_sources(sources_dir=None):
     return result
 
 
+# ローカルモードの統合テキストのキャッシュ: {(ソースの目印, キーワード): テキスト}
+_sources_text_cache = {}
+_sources_text_lock = threading.Lock()
+SOURCES_TEXT_CACHE_SIZE = 16
+
+
+def _local_sources_fingerprint():
+    """
+    ローカルのソース（sources/ 内のファイル・Instagram・Web）が変わったかどうかの目印。
+    sources/ は load_all_file_sources と同じファイル集合（_list_source_files）を見る。
+    """
+    files = []
+    for entry in _list_source_files(SOURCES_DIR):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((entry.name, st.st_size, st.st_mtime_ns))
+    lists = []
+    for path in (INSTAGRAM_FILE, LEGACY_INSTAGRAM_FILE, WEB_SOURCES_FILE, LEGACY_WEB_SOURCES_FILE):
+        try:
+            lists.append(tuple(_file_fingerprint(path)))
+        except OSError:
+            lists.append(None)
+    return (tuple(sorted(files)), tuple(lists))
+
+
 def get_all_sources_text(keyword=""):
     """
     全ソース（ローカルファイル + クラウド + Instagram）を統合してテキストとして返す。
     クラウド接続時はGoogle Sheetsのデータも含める。
+    ローカルモードでは、ソースが変わっていなければ前回組み立てたテキストを返す。
     """
-    parts = []
-
     cloud = _get_cloud()
 
+    cache_key = None
+    if not cloud:
+        cache_key = (_local_sources_fingerprint(), keyword)
+        with _sources_text_lock:
+            cached = _sources_text_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    combined = _build_all_sources_text(keyword, cloud)
+
+    if cache_key is not None:
+        with _sources_text_lock:
+            _sources_text_cache[cache_key] = combined
+            while len(_sources_text_cache) > SOURCES_TEXT_CACHE_SIZE:
+                del _sources_text_cache[next(iter(_sources_text_cache))]
+    return combined
+
+
+def _build_all_sources_text(keyword, cloud):
+    """get_all_sources_text の本体（キャッシュを介さずに組み立てる）"""
+    parts = []
+
     if cloud:
         # クラウドモード: Google Sheetsからデータ取得
         cloud_text = cloud.get_all_cloud_sources_text(keyword)
@@ -474,8 +838,9 @@ def save_uploaded_file(uploaded_file, target_dir=None):
     ローカル時: ファイルシステムに保存
     """
     cloud = _get_cloud()
+    ext = os.path.splitext(uploaded_file.name)[1].lower()
     
-    # まずローカルに一時保存（PDF/Excel読み込みのため）
+    # ローカルにも保存（保存済みファイル一覧に表示するため）
     if target_dir is None:
         target_dir = SOURCES_DIR
     os.makedirs(target_dir, exist_ok=True)
@@ -489,32 +854,38 @@ def save_uploaded_file(uploaded_file, target_dir=None):
         return None
     
     # クラウド対応: テキスト抽出してGoogle Sheetsに保存
+    # 書き出したファイルを読み直さず、メモリ上のアップロードデータから直接抽出する
     if cloud:
-        ext = os.path.splitext(uploaded_file.name)[1].lower()
         content = ""
         file_type = "text"
         
         if ext in TEXT_EXTENSIONS:
-            data = load_text_file(filepath)
+            data = load_text_file(uploaded_file)
             if data:
                 content = data["content"]
                 file_type = "text"
         elif ext in PDF_EXTENSIONS:
-            data = load_pdf_file(filepath)
+            data = load_pdf_file(uploaded_file)
             if data:
                 content = data["content"]
                 file_type = "pdf"
+                _write_extract_cache(filepath, data)
         elif ext in EXCEL_EXTENSIONS:
-            data = load_excel_file(filepath)
+            data = load_excel_file(uploaded_file)
             if data:
                 content = data["content"]
                 file_type = "excel"
+                _write_extract_cache(filepath, data)
         elif ext in IMAGE_EXTENSIONS:
             content = f"[画像ファイル] {uploaded_file.name}"
             file_type = "image"
         
         if content:
             cloud.add_source(uploaded_file.name, file_type, content)
+    else:
+        # ローカル: PDF/Excelの解析は画面を止めないよう裏で先に済ませておく
+        if ext in PDF_EXTENSIONS or ext in EXCEL_EXTENSIONS:
+            extract_in_background(filepath)
     
     print(f"✅ ファイル保存: {filepath}")
     return filepath
@@ -530,41 +901,154 @@ def get_source_summary():
     if cloud:
         return cloud.get_cloud_source_summary()
     
-    # ローカルモード
-    file_sources = load_all_file_sources()
+    # ローカルモード（件数だけなので、ファイルの中身は読まずに対応形式のファイルを拡張子で数える。
+    # 実際に読み込めたソース数ではなく保存ファイル数）
+    file_counts = _count_source_files()
+    total_file_count = sum(file_counts.values())
     insta_sources = load_instagram_sources()
     web_sources = load_web_sources()
 
     return {
-        "text_count": len(file_sources["text_sources"]),
-        "pdf_count": len(file_sources["pdf_sources"]),
-        "excel_count": len(file_sources["excel_sources"]),
-        "image_count": len(file_sources["image_sources"]),
+        "text_count": file_counts["text_sources"],
+        "pdf_count": file_counts["pdf_sources"],
+        "excel_count": file_counts["excel_sources"],
+        "image_count": file_counts["image_sources"],
         "instagram_count": len(insta_sources),
         "web_count": len(web_sources),
-        "total_file_count": file_sources["total_count"],
-        "total_count": file_sources["total_count"] + len(insta_sources) + len(web_sources),
+        "total_file_count": total_file_count,
+        "total_count": total_file_count + len(insta_sources) + len(web_sources),
     }
 
 
+def _count_source_files(sources_dir=None):
+    """
+    sources/ フォルダ内の対応形式のファイル数を種類ごとに数える。
+    中身は読まないので、読み込みに失敗するファイル（空・破損など）も1件として数える。
+    """
+    if sources_dir is None:
+        sources_dir = SOURCES_DIR
+    counts = {"text_sources": 0, "pdf_sources": 0, "excel_sources": 0, "image_sources": 0}
+    for entry in _list_source_files(sources_dir):
+        ext = os.path.splitext(entry.name)[1].lower()
+        if ext in TEXT_EXTENSIONS:
+            counts["text_sources"] += 1
+        elif ext in PDF_EXTENSIONS:
+            counts["pdf_sources"] += 1
+        elif ext in EXCEL_EXTENSIONS:
+            counts["excel_sources"] += 1
+        elif ext in IMAGE_EXTENSIONS:
+            counts["image_sources"] += 1
+    return counts
+
+
 # ==========================================
 # Webページソースの管理
 # ==========================================
 
-WEB_SOURCES_FILE = os.path.join(BASE_DIR, "blog_data", "web_sources.json")
+WEB_SOURCES_FILE = os.path.join(BASE_DIR, "blog_data", "web_sources.jsonl")
+LEGACY_WEB_SOURCES_FILE = os.path.join(BASE_DIR, "blog_data", "web_sources.json")
+
 
+# HTMLパーサー: lxmlがあれば高速なlxmlを、なければ標準のhtml.parserを使う
+# （ここでは読み込まず、インストールされているかだけを見る）
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
 
-def fetch_web_page(url, max_chars=30000):
+# Webページ取得用の共通HTTPセッション（Keep-Aliveで接続を使い回す。requestsは初回使用時に読み込む）
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session():
+    """共通のrequests.Sessionを返す（初回呼び出し時に作成）"""
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                adapter = HTTPAdapter(
+                    pool_connections=8, pool_maxsize=max(8, CRAWL_WORKERS),
+                    max_retries=Retry(total=2, backoff_factor=0.3)
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+# BeautifulSoupがない場合の簡易タグ除去用
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 取得したWebページの本文キャッシュ（同じURLを何度も取り込み直すときの再取得を省く）
+WEB_PAGE_CACHE_DIR = os.path.join(BASE_DIR, "blog_data", "web_page_cache")
+WEB_PAGE_CACHE_TTL = 24 * 60 * 60  # 秒
+
+
+def _web_page_cache_path(url, max_chars):
+    key = hashlib.sha1(f"{url}\n{max_chars}".encode("utf-8")).hexdigest()
+    return os.path.join(WEB_PAGE_CACHE_DIR, f"{key}.json")
+
+
+def _read_web_page_cache(url, max_chars):
+    """TTL内に取得済みのページがあれば返す"""
+    cache_path = _web_page_cache_path(url, max_chars)
+    try:
+        if time.time() - os.path.getmtime(cache_path) < WEB_PAGE_CACHE_TTL:
+            return _read_json(cache_path)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _extract_text(soup, max_chars):
+    """
+    soup のテキストを空行を除いた行単位で連結して返す。
+    max_chars を超えた時点で残りのノードはたどらない（呼び出し側で max_chars に切り詰める）。
+    """
+    lines = []
+    total_chars = 0
+    for string in soup.stripped_strings:
+        for line in string.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            lines.append(line)
+            total_chars += len(line) + 1
+        # 連結後の長さ（最後の改行ぶんを除く）が max_chars を超えたら十分
+        if total_chars - 1 > max_chars:
+            break
+    return "\n".join(lines)
+
+
+def fetch_web_page(url, max_chars=30000, use_cache=True):
     """
     URLからWebページのテキスト内容を取得する。
     HTMLタグを除去して本文テキストのみ抽出する。
+    use_cache=True の場合、WEB_PAGE_CACHE_TTL 内に取得済みのページはキャッシュから返す。
     """
+    if use_cache:
+        cached = _read_web_page_cache(url, max_chars)
+        if cached:
+            return cached
+
+    result = _fetch_web_page(url, max_chars)
+    if use_cache and result["success"]:
+        try:
+            os.makedirs(WEB_PAGE_CACHE_DIR, exist_ok=True)
+            _write_json_atomic(_web_page_cache_path(url, max_chars), result)
+        except Exception as e:
+            print(f"ページキャッシュ保存エラー ({url}): {e}")
+    return result
+
+
+def _fetch_web_page(url, max_chars):
+    """fetch_web_page の本体（キャッシュを介さずに取得する）"""
     try:
-        import requests
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=15)
+        response = _get_http_session().get(url, timeout=15)
         response.raise_for_status()
         
         # エンコーディング自動判定
@@ -574,7 +1058,7 @@ def fetch_web_page(url, max_chars=30000):
         # BeautifulSoupでテキスト抽出
         try:
             from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
+            soup = BeautifulSoup(html, HTML_PARSER)
             
             # 不要なタグを除去
             for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
@@ -583,19 +1067,14 @@ def fetch_web_page(url, max_chars=30000):
             # ページタイトル取得
             title = soup.title.string.strip() if soup.title and soup.title.string else url
             
-            # 本文テキスト抽出
-            text = soup.get_text(separator="\n", strip=True)
-            
-            # 空行の重複を除去
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            text = "\n".join(lines)
+            # 本文テキスト抽出（空行は除去。max_chars を超えた分は読まない）
+            text = _extract_text(soup, max_chars)
             
         except ImportError:
             # BeautifulSoupがない場合はHTML正規表現で簡易除去
-            import re
             title = url
-            text = re.sub(r'<[^>]+>', ' ', html)
-            text = re.sub(r'\s+', ' ', text).strip()
+            text = _HTML_TAG_RE.sub(' ', html)
+            text = _WHITESPACE_RE.sub(' ', text).strip()
         
         # 文字数制限
         if len(text) > max_chars:
@@ -635,8 +1114,8 @@ def crawl_site(start_url, max_pages=10, max_chars_per_page=15000):
     """
     try:
         from urllib.parse import urlparse, urljoin
-        import requests
         from bs4 import BeautifulSoup
+        session = _get_http_session()
     except ImportError:
         return [{"success": False, "url": start_url, "error": "必要なライブラリがありません"}]
     
@@ -649,36 +1128,18 @@ def crawl_site(start_url, max_pages=10, max_chars_per_page=15000):
     to_visit = [start_url]
     results = []
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
+    # ファイル拡張子を除外（画像、PDF等）
+    skip_ext = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".pdf", ".zip", ".mp4", ".mp3", ".css", ".js"]
     
-    while to_visit and len(results) < max_pages:
-        url = to_visit.pop(0)
-        
-        # 正規化
-        url = url.split("#")[0]  # フラグメント除去
-        if url in visited:
-            continue
-        visited.add(url)
-        
-        # 同一ドメインチェック
-        parsed = urlparse(url)
-        if parsed.netloc != base_domain:
-            continue
-        
-        # ファイル拡張子を除外（画像、PDF等）
-        skip_ext = [".jpg", ".jpeg", ".png", ".gif", ".webp", ".pdf", ".zip", ".mp4", ".mp3", ".css", ".js"]
-        if any(url.lower().endswith(ext) for ext in skip_ext):
-            continue
-        
+    def _crawl_page(url):
+        """1ページを取得して (結果dict or None, ページ内リンク) を返す"""
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = session.get(url, timeout=10)
             if response.status_code != 200:
-                continue
+                return None, []
             
             response.encoding = response.apparent_encoding or "utf-8"
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = BeautifulSoup(response.text, HTML_PARSER)
             
             # 不要なタグを除去
             for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
@@ -688,34 +1149,57 @@ def crawl_site(start_url, max_pages=10, max_chars_per_page=15000):
             title = soup.title.string.strip() if soup.title and soup.title.string else url
             
             # 本文テキスト
-            text = soup.get_text(separator="\n", strip=True)
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            text = "\n".join(lines)
+            text = _extract_text(soup, max_chars_per_page)
             
             if len(text) > max_chars_per_page:
                 text = text[:max_chars_per_page] + "\n...(以下省略)"
             
             # 短すぎるページはスキップ（ナビページ等）
             if len(text) < 100:
-                continue
+                return None, []
+            
+            # リンクを収集
+            links = [urljoin(url, a_tag["href"]).split("#")[0] for a_tag in soup.find_all("a", href=True)]
             
-            results.append({
+            return {
                 "success": True,
                 "url": url,
                 "title": title,
                 "text": text,
                 "char_count": len(text)
-            })
-            
-            # リンクを収集
-            for a_tag in soup.find_all("a", href=True):
-                link = urljoin(url, a_tag["href"])
-                link = link.split("#")[0]
-                if link not in visited and urlparse(link).netloc == base_domain:
-                    to_visit.append(link)
+            }, links
         
         except Exception:
-            continue
+            return None, []
+    
+    # 見つかった順に、必要なページ数ぶんをまとめて並列に取得する
+    # （同一サイトへの負荷を抑えるため同時接続数は CRAWL_WORKERS まで）
+    with concurrent.futures.ThreadPoolExecutor(max_workers=CRAWL_WORKERS) as executor:
+        while to_visit and len(results) < max_pages:
+            batch = []
+            while to_visit and len(batch) < max_pages - len(results):
+                url = to_visit.pop(0)
+                
+                # 正規化
+                url = url.split("#")[0]  # フラグメント除去
+                if url in visited:
+                    continue
+                visited.add(url)
+                
+                # 同一ドメインチェック
+                if urlparse(url).netloc != base_domain:
+                    continue
+                
+                if any(url.lower().endswith(ext) for ext in skip_ext):
+                    continue
+                batch.append(url)
+            
+            for page, links in executor.map(_crawl_page, batch):
+                if page:
+                    results.append(page)
+                for link in links:
+                    if link not in visited and urlparse(link).netloc == base_domain:
+                        to_visit.append(link)
     
     return results
 
@@ -724,16 +1208,18 @@ def crawl_site(start_url, max_pages=10, max_chars_per_page=15000):
 # YouTube字幕ソースの取得
 # ==========================================
 
+# YouTube URLの動画ID部分（watch?v= / youtu.be / embed / shorts）
+_YOUTUBE_ID_PATTERNS = [
+    re.compile(r'(?:v=|\/v\/|youtu\.be\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:embed\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:shorts\/)([a-zA-Z0-9_-]{11})'),
+]
+
+
 def extract_youtube_video_id(url):
     """YouTube URLから動画IDを抽出する"""
-    import re
-    patterns = [
-        r'(?:v=|\/v\/|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-        r'(?:embed\/)([a-zA-Z0-9_-]{11})',
-        r'(?:shorts\/)([a-zA-Z0-9_-]{11})',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _YOUTUBE_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return None
@@ -761,9 +1247,8 @@ def fetch_youtube_transcript(url, max_chars=30000):
     # 動画タイトルを取得（oEmbed API - APIキー不要）
     title = f"YouTube動画 ({video_id})"
     try:
-        import requests
         oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-        resp = requests.get(oembed_url, timeout=5)
+        resp = _get_http_session().get(oembed_url, timeout=5)
         if resp.status_code == 200:
             title = resp.json().get("title", title)
     except:
@@ -840,13 +1325,10 @@ def fetch_youtube_transcript(url, max_chars=30000):
 
 def load_web_sources():
     """保存済みのWebページソースを読み込む"""
-    if os.path.exists(WEB_SOURCES_FILE):
-        try:
-            with open(WEB_SOURCES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    try:
+        return _load_json_list(WEB_SOURCES_FILE, LEGACY_WEB_SOURCES_FILE)
+    except:
+        return []
 
 
 def save_web_source(url, title="", text="", tags=""):
@@ -866,12 +1348,9 @@ def save_web_source(url, title="", text="", tags=""):
         "saved_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
-    sources.append(new_source)
-    
     try:
         os.makedirs(os.path.dirname(WEB_SOURCES_FILE), exist_ok=True)
-        with open(WEB_SOURCES_FILE, "w", encoding="utf-8") as f:
-            json.dump(sources, f, ensure_ascii=False, indent=2)
+        _append_jsonl(WEB_SOURCES_FILE, new_source)
         
         # クラウドにも保存
         cloud = _get_cloud()
@@ -892,8 +1371,7 @@ def delete_web_source(source_id):
     sources = load_web_sources()
     sources = [s for s in sources if s.get("id") != source_id]
     try:
-        with open(WEB_SOURCES_FILE, "w", encoding="utf-8") as f:
-            json.dump(sources, f, ensure_ascii=False, indent=2)
+        _write_jsonl(WEB_SOURCES_FILE, sources)
         return True
     except:
         return False
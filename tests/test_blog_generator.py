@@ -0,0 +1,298 @@
+import os
+
+import affiliate_manager
+import blog_generator
+
+
+def _fake_body(calls):
+    def generate_article_body(keyword, outline_data, research_data, api_key, custom_sources_text="",
+                              progress_callback=None, target_product="", html_callback=None, deterministic=False,
+                              use_cache=True):
+        calls.append(keyword)
+        if progress_callback:
+            progress_callback("執筆中")
+        if html_callback:
+            html_callback("<h2>見出し</h2>")
+        return "<h2>見出し</h2><p>本文</p>", None
+    return generate_article_body
+
+
+def test_generate_article_body_cached_twice_with_same_inputs(monkeypatch):
+    calls = []
+    monkeypatch.setattr(blog_generator, "generate_article_body", _fake_body(calls))
+    monkeypatch.setattr(affiliate_manager, "load_affiliate_links", lambda: {})
+    monkeypatch.setattr(blog_generator, "_BODY_CACHE", blog_generator.collections.OrderedDict())
+
+    outline = {"title": "タイトル", "outline": [{"h2": "見出し", "h3_list": []}]}
+    progress = []
+    drafts = []
+    args = ("キーワード", outline, {"combined_content": "リサーチ"}, "dummy-key")
+    kwargs = dict(custom_sources_text="ソース", target_product="商品",
+                  progress_callback=progress.append, html_callback=drafts.append)
+
+    first = blog_generator.generate_article_body_cached(*args, **kwargs)
+    second = blog_generator.generate_article_body_cached(*args, **kwargs)
+
+    assert first == second == ("<h2>見出し</h2><p>本文</p>", None)
+    assert calls == ["キーワード"]
+    # コールバックは実際に生成したときだけ呼ばれる
+    assert progress == ["執筆中"]
+    assert drafts == ["<h2>見出し</h2>"]
+
+
+def test_generate_article_body_cached_skips_partial_article(monkeypatch):
+    calls = []
+
+    def generate_article_body(keyword, outline_data, research_data, api_key, **kwargs):
+        calls.append(keyword)
+        return f"<p>{blog_generator.SECTION_SKIPPED_NOTE}</p>", None
+
+    monkeypatch.setattr(blog_generator, "generate_article_body", generate_article_body)
+    monkeypatch.setattr(affiliate_manager, "load_affiliate_links", lambda: {})
+    monkeypatch.setattr(blog_generator, "_BODY_CACHE", blog_generator.collections.OrderedDict())
+
+    for _ in range(2):
+        article_html, error = blog_generator.generate_article_body_cached("キーワード", {}, None, "dummy-key")
+        assert error is None
+        assert blog_generator.SECTION_SKIPPED_NOTE in article_html
+    assert calls == ["キーワード", "キーワード"]
+
+
+def _fake_outline_api(monkeypatch, calls):
+    def generate_content_api(api_key, system_prompt, user_prompt, **kwargs):
+        calls.append(kwargs.get("deterministic"))
+        return '{"title": "タイトル", "meta_description": "説明", "outline": []}', None
+
+    monkeypatch.setattr(blog_generator, "generate_content_api", generate_content_api)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+    monkeypatch.setattr(blog_generator, "load_product_info", lambda max_chars=None: "商品情報")
+    monkeypatch.setattr(blog_generator, "_OUTLINE_CACHE", blog_generator.collections.OrderedDict())
+
+
+def test_normalize_keyword_keeps_word_order():
+    assert blog_generator.normalize_keyword("ＡＩ　ブログ  作成") == "ai ブログ 作成"
+    assert blog_generator.normalize_keyword("ブログ 作成") != blog_generator.normalize_keyword("作成 ブログ")
+    assert blog_generator.normalize_keyword("a a b") != blog_generator.normalize_keyword("a b")
+
+
+def test_outline_cache_depends_on_sources_and_deterministic(monkeypatch):
+    calls = []
+    _fake_outline_api(monkeypatch, calls)
+    outline = blog_generator.generate_article_outline
+
+    outline("AI ブログ", None, "AIza-dummy", custom_sources_text="ソースA")
+    outline("ａｉ　ブログ", None, "AIza-dummy", custom_sources_text="ソースA")
+    assert calls == [False]
+
+    outline("AI ブログ", None, "AIza-dummy", custom_sources_text="ソースB")
+    assert calls == [False, False]
+
+    outline("AI ブログ", None, "AIza-dummy", custom_sources_text="ソースA", deterministic=True)
+    assert calls == [False, False, True]
+
+    outline("AI ブログ", None, "AIza-dummy", custom_sources_text="ソースA", use_cache=False)
+    assert calls == [False, False, True, False]
+
+
+def test_outline_cache_is_bounded(monkeypatch):
+    calls = []
+    _fake_outline_api(monkeypatch, calls)
+    monkeypatch.setattr(blog_generator, "OUTLINE_CACHE_SIZE", 2)
+
+    for keyword in ("a", "b", "c"):
+        blog_generator.generate_article_outline(keyword, None, "AIza-dummy")
+    assert len(blog_generator._OUTLINE_CACHE) == 2
+
+
+class _FakeResponse:
+    def __init__(self, status_code, text="error"):
+        self.status_code = status_code
+        self.text = text
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_gemini_retry_closes_response_and_skips_pinned_model(monkeypatch):
+    responses = []
+
+    def post(url, **kwargs):
+        responses.append(_FakeResponse(404))
+        return responses[-1]
+
+    invalidated = []
+    monkeypatch.setattr(blog_generator._SESSION, "post", post)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+    monkeypatch.setattr(blog_generator, "invalidate_model_cache", invalidated.append)
+
+    monkeypatch.delenv("GEMINI_MODEL", raising=False)
+    result, error = blog_generator.generate_content_gemini("AIza-dummy", "sys", "user")
+    assert result is None and "404" in error
+    assert len(responses) == 2 and responses[0].closed
+    assert invalidated == ["AIza-dummy"]
+
+    responses.clear()
+    invalidated.clear()
+    monkeypatch.setenv("GEMINI_MODEL", "gemini-test")
+    result, error = blog_generator.generate_content_gemini("AIza-dummy", "sys", "user")
+    assert result is None and "404" in error
+    assert len(responses) == 1
+    assert invalidated == []
+
+
+def test_gemini_rediscovers_only_when_model_is_unavailable(monkeypatch):
+    responses = []
+    invalidated = []
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+    monkeypatch.setattr(blog_generator, "invalidate_model_cache", invalidated.append)
+    monkeypatch.delenv("GEMINI_MODEL", raising=False)
+
+    def respond_with(status_code, text):
+        def post(url, **kwargs):
+            responses.append(_FakeResponse(status_code, text))
+            return responses[-1]
+        monkeypatch.setattr(blog_generator._SESSION, "post", post)
+
+    # ペイロードの誤りはモデルの問題ではないので、再検出も再送もしない
+    respond_with(400, '{"error": {"message": "Invalid value at \'generation_config.temperature\'"}}')
+    result, error = blog_generator.generate_content_gemini("AIza-dummy", "sys", "user")
+    assert result is None and "400" in error
+    assert len(responses) == 1
+    assert invalidated == []
+
+    responses.clear()
+    respond_with(400, '{"error": {"message": "models/gemini-test is not found for API version v1beta"}}')
+    blog_generator.generate_content_gemini("AIza-dummy", "sys", "user")
+    assert len(responses) == 2 and responses[0].closed
+    assert invalidated == ["AIza-dummy"]
+
+
+def _gemini_ok(text):
+    response = _FakeResponse(200)
+    response.json = lambda: {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    return response
+
+
+def test_gemini_json_mode_only_on_v1beta(monkeypatch):
+    payloads = []
+
+    def post(url, json=None, **kwargs):
+        payloads.append(json["generationConfig"])
+        return _gemini_ok('{"title": "t"}')
+
+    monkeypatch.setattr(blog_generator._SESSION, "post", post)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1", "gemini-test"))
+    result, error = blog_generator.generate_content_gemini("AIza-dummy", "sys", "user", json_schema=blog_generator.OUTLINE_SCHEMA)
+    assert (result, error) == ('{"title": "t"}', None)
+    assert "responseSchema" not in payloads[0] and "responseMimeType" not in payloads[0]
+
+    payloads.clear()
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+    blog_generator.generate_content_gemini("AIza-dummy", "sys", "user", json_schema=blog_generator.OUTLINE_SCHEMA)
+    assert payloads[0]["responseSchema"] == blog_generator.OUTLINE_SCHEMA
+
+
+def test_gemini_falls_back_when_json_mode_is_rejected(monkeypatch):
+    payloads = []
+    invalidated = []
+
+    def post(url, json=None, **kwargs):
+        payloads.append(json["generationConfig"])
+        if "responseSchema" in json["generationConfig"]:
+            return _FakeResponse(400, 'Invalid JSON payload received. Unknown name "responseSchema" at \'generation_config\'')
+        return _gemini_ok("{}")
+
+    monkeypatch.setattr(blog_generator._SESSION, "post", post)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+    monkeypatch.setattr(blog_generator, "invalidate_model_cache", invalidated.append)
+    monkeypatch.delenv("GEMINI_MODEL", raising=False)
+
+    result, error = blog_generator.generate_content_gemini("AIza-dummy", "sys", "user", json_schema=blog_generator.OUTLINE_SCHEMA)
+    assert (result, error) == ("{}", None)
+    assert len(payloads) == 2 and "responseSchema" not in payloads[1]
+    assert invalidated == []
+
+
+def _isolated_response_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(blog_generator, "RESPONSE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(blog_generator, "_RESPONSE_MEMORY_CACHE", blog_generator.collections.OrderedDict())
+
+
+def test_response_cache_is_keyed_on_the_resolved_model(monkeypatch, tmp_path):
+    _isolated_response_cache(monkeypatch, tmp_path)
+    calls = []
+
+    def generate_content_gemini(api_key, system_prompt, user_prompt, temperature, **kwargs):
+        calls.append(model[0])
+        return f"応答 {model[0]}", None
+
+    model = ["gemini-a"]
+    monkeypatch.setattr(blog_generator, "generate_content_gemini", generate_content_gemini)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", model[0]))
+
+    args = ("AIza-dummy", "sys", "user")
+    assert blog_generator.generate_content_api(*args, deterministic=True) == ("応答 gemini-a", None)
+    assert blog_generator.generate_content_api(*args, deterministic=True) == ("応答 gemini-a", None)
+    model[0] = "gemini-b"
+    assert blog_generator.generate_content_api(*args, deterministic=True) == ("応答 gemini-b", None)
+    assert calls == ["gemini-a", "gemini-b"]
+
+
+def test_response_cache_expires_after_ttl(monkeypatch, tmp_path):
+    _isolated_response_cache(monkeypatch, tmp_path)
+    cache_path = str(tmp_path / "entry.txt")
+    now = [1000.0]
+    monkeypatch.setattr(blog_generator.time, "time", lambda: now[0])
+
+    blog_generator._write_response_cache(cache_path, "応答")
+    os.utime(cache_path, (now[0], now[0]))
+    assert blog_generator._read_response_cache(cache_path) == "応答"
+
+    now[0] += blog_generator.RESPONSE_CACHE_TTL + 1
+    assert blog_generator._read_response_cache(cache_path) is None
+    assert cache_path not in blog_generator._RESPONSE_MEMORY_CACHE
+
+
+def test_response_memory_cache_is_bounded_lru(monkeypatch, tmp_path):
+    _isolated_response_cache(monkeypatch, tmp_path)
+    monkeypatch.setattr(blog_generator, "RESPONSE_MEMORY_CACHE_SIZE", 2)
+
+    blog_generator._remember_response("a", "A", blog_generator.time.time())
+    blog_generator._remember_response("b", "B", blog_generator.time.time())
+    # a を読むと最近使ったものになり、次に追い出されるのは b になる
+    assert blog_generator._read_response_cache("a") == "A"
+    blog_generator._remember_response("c", "C", blog_generator.time.time())
+    assert list(blog_generator._RESPONSE_MEMORY_CACHE) == ["a", "c"]
+
+
+def test_creative_responses_are_not_cached(monkeypatch, tmp_path):
+    _isolated_response_cache(monkeypatch, tmp_path)
+    calls = []
+
+    def generate_content_gemini(api_key, system_prompt, user_prompt, temperature, **kwargs):
+        calls.append(temperature)
+        return f"応答{len(calls)}", None
+
+    monkeypatch.setattr(blog_generator, "generate_content_gemini", generate_content_gemini)
+    monkeypatch.setattr(blog_generator, "get_cached_model", lambda api_key: ("v1beta", "gemini-test"))
+
+    first = blog_generator.generate_content_api("AIza-dummy", "sys", "user", temperature=0.7)
+    second = blog_generator.generate_content_api("AIza-dummy", "sys", "user", temperature=0.7)
+    assert first != second
+    assert list(tmp_path.iterdir()) == []
+
+    blog_generator.generate_content_api("AIza-dummy", "sys", "user", temperature=0.2)
+    blog_generator.generate_content_api("AIza-dummy", "sys", "user", temperature=0.2)
+    assert calls == [0.7, 0.7, 0.2]
+
+
+def test_generate_article_body_cached_can_be_bypassed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(blog_generator, "generate_article_body", _fake_body(calls))
+    monkeypatch.setattr(affiliate_manager, "load_affiliate_links", lambda: {})
+    monkeypatch.setattr(blog_generator, "_BODY_CACHE", blog_generator.collections.OrderedDict())
+
+    blog_generator.generate_article_body_cached("キーワード", {}, None, "dummy-key")
+    blog_generator.generate_article_body_cached("キーワード", {}, None, "dummy-key", use_cache=False)
+    assert calls == ["キーワード", "キーワード"]
@@ -0,0 +1,93 @@
+import os
+
+import source_loader
+
+
+def _isolated_sources(monkeypatch, tmp_path):
+    sources_dir = tmp_path / "sources"
+    sources_dir.mkdir()
+    monkeypatch.setattr(source_loader, "SOURCES_DIR", str(sources_dir))
+    monkeypatch.setattr(source_loader, "SOURCE_CACHE_DIR", str(tmp_path / "source_cache"))
+    monkeypatch.setattr(source_loader, "INSTAGRAM_FILE", str(tmp_path / "instagram_sources.jsonl"))
+    monkeypatch.setattr(source_loader, "LEGACY_INSTAGRAM_FILE", str(tmp_path / "instagram_sources.json"))
+    monkeypatch.setattr(source_loader, "WEB_SOURCES_FILE", str(tmp_path / "web_sources.jsonl"))
+    monkeypatch.setattr(source_loader, "LEGACY_WEB_SOURCES_FILE", str(tmp_path / "web_sources.json"))
+    monkeypatch.setattr(source_loader, "_get_cloud", lambda: None)
+    monkeypatch.setattr(source_loader, "_sources_text_cache", {})
+    monkeypatch.setattr(source_loader, "_json_list_cache", {})
+    return sources_dir
+
+
+def test_all_sources_text_follows_the_loaded_file_set(monkeypatch, tmp_path):
+    sources_dir = _isolated_sources(monkeypatch, tmp_path)
+    note = sources_dir / "note.txt"
+    note.write_text("最初のメモです。", encoding="utf-8")
+    (sources_dir / "sub").mkdir()
+    (sources_dir / "sub" / "inner.txt").write_text("サブフォルダのメモ", encoding="utf-8")
+
+    first = source_loader.get_all_sources_text()
+    assert "最初のメモです。" in first
+    # サブフォルダの中は読み込み対象外
+    assert "サブフォルダのメモ" not in first
+
+    note.write_text("書き換えた後のメモです。", encoding="utf-8")
+    second = source_loader.get_all_sources_text()
+    assert "書き換えた後のメモです。" in second
+
+
+def test_source_summary_counts_supported_files_only(monkeypatch, tmp_path):
+    sources_dir = _isolated_sources(monkeypatch, tmp_path)
+    (sources_dir / "a.txt").write_text("テキスト", encoding="utf-8")
+    (sources_dir / "b.md").write_text("マークダウン", encoding="utf-8")
+    (sources_dir / "c.png").write_bytes(b"")
+    (sources_dir / "d.docx").write_bytes(b"")
+    (sources_dir / "sub").mkdir()
+    (sources_dir / "sub" / "e.txt").write_text("対象外", encoding="utf-8")
+
+    summary = source_loader.get_source_summary()
+    assert summary["text_count"] == 2
+    assert summary["image_count"] == 1
+    assert summary["total_file_count"] == 3
+
+
+def test_legacy_json_is_migrated_to_jsonl_and_appended(monkeypatch, tmp_path):
+    _isolated_sources(monkeypatch, tmp_path)
+    legacy = tmp_path / "instagram_sources.json"
+    legacy.write_text('[{"id": 1, "account_name": "a", "caption": "キャプション"}]', encoding="utf-8")
+
+    assert [s["id"] for s in source_loader.load_instagram_sources()] == [1]
+    jsonl = tmp_path / "instagram_sources.jsonl"
+    assert jsonl.read_text(encoding="utf-8").count("\n") == 1
+
+    assert source_loader.save_instagram_source("b", "次の投稿")
+    assert [s["id"] for s in source_loader.load_instagram_sources()] == [1, 2]
+    assert jsonl.read_text(encoding="utf-8").count("\n") == 2
+
+    # 移行済みなら旧ファイルが残っていても読み直さない
+    legacy.write_text("[]", encoding="utf-8")
+    monkeypatch.setattr(source_loader, "_json_list_cache", {})
+    assert [s["id"] for s in source_loader.load_instagram_sources()] == [1, 2]
+
+
+def test_extract_cache_is_keyed_on_size_and_mtime(monkeypatch, tmp_path):
+    sources_dir = _isolated_sources(monkeypatch, tmp_path)
+    calls = []
+
+    def load_pdf_file(filepath, max_chars=50000, include_tables=True):
+        calls.append(filepath)
+        return {"filename": os.path.basename(filepath), "content": f"内容{len(calls)}"}
+
+    monkeypatch.setattr(source_loader, "load_pdf_file", load_pdf_file)
+    pdf = sources_dir / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1")
+
+    assert source_loader._load_with_cache(str(pdf))["content"] == "内容1"
+    assert source_loader._load_with_cache(str(pdf))["content"] == "内容1"
+    assert len(calls) == 1
+
+    # 同じサイズでも更新日時が変われば解析し直す
+    pdf.write_bytes(b"%PDF-2")
+    stat = os.stat(pdf)
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert source_loader._load_with_cache(str(pdf))["content"] == "内容2"
+    assert len(calls) == 2
@@ -0,0 +1,59 @@
+import web_researcher
+
+
+def _page(url):
+    return {
+        "url": url,
+        "title": f"タイトル {url}",
+        "headings": [f"見出し {url}"],
+        "content": f"{url} の本文です。" * 20,
+    }
+
+
+def _fake_web(monkeypatch, tmp_path, urls):
+    searches = []
+
+    def search_google(keyword, num_results=8):
+        searches.append(keyword)
+        return list(urls)
+
+    monkeypatch.setattr(web_researcher, "RESEARCH_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(web_researcher, "_research_memory_cache", {})
+    monkeypatch.setattr(web_researcher, "search_google", search_google)
+    monkeypatch.setattr(web_researcher, "extract_page_content", _page)
+    return searches
+
+
+def test_research_results_are_cached(monkeypatch, tmp_path):
+    searches = _fake_web(monkeypatch, tmp_path, ["https://a.example/", "https://b.example/"])
+
+    first = web_researcher.research_keyword("キーワード", max_sources=2)
+    second = web_researcher.research_keyword("キーワード", max_sources=2)
+    assert first["source_count"] == 2
+    assert second == first
+    assert searches == ["キーワード"]
+
+    # メモリになくてもディスクから読める
+    monkeypatch.setattr(web_researcher, "_research_memory_cache", {})
+    assert web_researcher.research_keyword("キーワード", max_sources=2) == first
+    assert searches == ["キーワード"]
+
+    web_researcher.research_keyword("キーワード", max_sources=2, use_cache=False)
+    assert searches == ["キーワード", "キーワード"]
+
+
+def test_empty_research_results_are_not_cached(monkeypatch, tmp_path):
+    searches = _fake_web(monkeypatch, tmp_path, [])
+
+    for _ in range(2):
+        assert web_researcher.research_keyword("キーワード")["source_count"] == 0
+    assert searches == ["キーワード", "キーワード"]
+    assert list(tmp_path.iterdir()) == []
+
+    # 検索結果はあってもページが1件も取れなかった場合もキャッシュしない
+    searches = _fake_web(monkeypatch, tmp_path, ["https://a.example/"])
+    monkeypatch.setattr(web_researcher, "extract_page_content", lambda url: None)
+    for _ in range(2):
+        assert web_researcher.research_keyword("キーワード")["source_count"] == 0
+    assert len(searches) == 2
+    assert list(tmp_path.iterdir()) == []
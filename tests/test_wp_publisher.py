@@ -0,0 +1,64 @@
+import wp_publisher
+
+
+class _FakeResponse:
+    def __init__(self, status_code, terms, headers=None):
+        self.status_code = status_code
+        self._terms = terms
+        self.headers = headers or {}
+
+    def json(self):
+        return self._terms
+
+
+class _FakeSession:
+    def __init__(self, pages, total_pages):
+        self.pages = pages
+        self.total_pages = total_pages
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        page = int(url.rsplit("&page=", 1)[1]) if "&page=" in url else 1
+        if page not in self.pages:
+            return _FakeResponse(500, [])
+        return _FakeResponse(200, self.pages[page], {"X-WP-TotalPages": str(self.total_pages)})
+
+
+def _term(term_id):
+    return {"id": term_id, "name": f"term{term_id}", "slug": f"term-{term_id}", "count": 1}
+
+
+def _configure(session):
+    wp_publisher.configure("https://example.com/", "user", "pass", session=session)
+
+
+def test_get_all_terms_fetches_every_page_in_order():
+    session = _FakeSession({1: [_term(1), _term(2)], 2: [_term(3)], 3: [_term(4)]}, total_pages=3)
+    _configure(session)
+
+    terms = wp_publisher._get_all_terms("categories")
+
+    assert [t["id"] for t in terms] == [1, 2, 3, 4]
+    assert terms[0] == {"id": 1, "name": "term1", "slug": "term-1"}
+    assert sorted(session.urls) == [
+        "https://example.com/wp-json/wp/v2/categories?per_page=100",
+        "https://example.com/wp-json/wp/v2/categories?per_page=100&page=2",
+        "https://example.com/wp-json/wp/v2/categories?per_page=100&page=3",
+    ]
+
+
+def test_get_all_terms_single_page_and_failed_pages():
+    session = _FakeSession({1: [_term(1)]}, total_pages=1)
+    _configure(session)
+    assert [t["id"] for t in wp_publisher._get_all_terms("tags")] == [1]
+    assert len(session.urls) == 1
+
+    # 2ページ目以降の取得に失敗したページは空として扱う
+    session = _FakeSession({1: [_term(1)]}, total_pages=2)
+    _configure(session)
+    assert [t["id"] for t in wp_publisher._get_all_terms("tags")] == [1]
+
+    session = _FakeSession({}, total_pages=1)
+    _configure(session)
+    assert wp_publisher.get_categories() == []
@@ -5,11 +5,43 @@ Web Researcher モジュール
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import os
 import re
+import copy
+import json
 import time
+import hashlib
+import threading
+import unicodedata
 import random
 import concurrent.futures
+from urllib.parse import urlparse
+
+# HTMLパーサー: lxmlがあれば高速なlxmlを、なければ標準のhtml.parserを使う
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# リサーチ結果のキャッシュ（同じキーワードで作り直すときに検索・取得をやり直さない）
+RESEARCH_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blog_data", "research_cache")
+RESEARCH_CACHE_TTL = 24 * 60 * 60  # 秒
+RESEARCH_MEMORY_CACHE_SIZE = 32  # メモリに残すキーワード数
+_research_memory_cache = {}
+_research_cache_lock = threading.Lock()
+
+# 複数キーワードを同時に調べる数と、検索エンジンへのリクエスト間隔（秒）
+RESEARCH_KEYWORD_WORKERS = 3
+SEARCH_MIN_INTERVAL = 2.0
+_search_lock = threading.Lock()
+_last_search_at = 0.0
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_MANY_NEWLINES_RE = re.compile(r"\n{3,}")
 
 # ユーザーエージェント一覧（ブロック回避用）
 USER_AGENTS = [
@@ -19,6 +51,16 @@ USER_AGENTS = [
 ]
 
 
+# Keep-Aliveで接続を使い回すための共通HTTPセッション（並列取得の同時接続数に合わせてプール）
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+
 def get_headers():
     """ランダムなユーザーエージェントでヘッダーを生成"""
     return {
@@ -28,6 +70,16 @@ def get_headers():
     }
 
 
+def _wait_search_interval():
+    """前回の検索から SEARCH_MIN_INTERVAL 秒たつまで待つ（並列リサーチでも検索エンジンを連打しない）"""
+    global _last_search_at
+    with _search_lock:
+        wait = _last_search_at + SEARCH_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_search_at = time.monotonic()
+
+
 def search_google(keyword, num_results=8):
     """
     Google検索でキーワードの上位ページURLを取得する。
@@ -35,6 +87,7 @@ def search_google(keyword, num_results=8):
     制限がかかる場合はDuckDuckGoにフォールバック。
     """
     urls = []
+    _wait_search_interval()
 
     # まずDuckDuckGoで検索（レート制限が緩い）
     urls = _search_duckduckgo(keyword, num_results)
@@ -50,13 +103,13 @@ def _search_duckduckgo(keyword, num_results=8):
     """DuckDuckGo HTMLから検索結果を取得"""
     try:
         url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(keyword)}"
-        response = requests.get(url, headers=get_headers(), timeout=15)
+        response = _SESSION.get(url, headers=get_headers(), timeout=15)
 
         if response.status_code != 200:
             print(f"  DuckDuckGo検索失敗: ステータス {response.status_code}")
             return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         results = []
 
         # DuckDuckGo HTML版の結果リンクを取得
@@ -88,13 +141,13 @@ def _search_google_direct(keyword, num_results=8):
     """Google検索から結果URLを取得（フォールバック）"""
     try:
         url = f"https://www.google.co.jp/search?q={requests.utils.quote(keyword)}&hl=ja&num={num_results}"
-        response = requests.get(url, headers=get_headers(), timeout=15)
+        response = _SESSION.get(url, headers=get_headers(), timeout=15)
 
         if response.status_code != 200:
             print(f"  Google検索失敗: ステータス {response.status_code}")
             return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         results = []
 
         for a_tag in soup.find_all("a", href=True):
@@ -115,17 +168,21 @@ def _search_google_direct(keyword, num_results=8):
         return []
 
 
+# 記事ソースから除外するサイト（広告・SNS・EC）。ホスト名のラベルと完全一致で判定する
+# 例: "google" は google.com / www.google.co.jp に一致する
+_EXCLUDE_SITE_NAMES = frozenset([
+    "google", "youtube", "twitter", "facebook",
+    "instagram", "amazon", "rakuten", "yahoo",
+    "pinterest", "tiktok", "linkedin",
+])
+
+
 def _is_valid_url(url):
     """有効な記事URLかチェック（広告やSNSを除外）"""
-    exclude_domains = [
-        "google.", "youtube.", "twitter.", "facebook.",
-        "instagram.", "amazon.", "rakuten.", "yahoo.",
-        "pinterest.", "tiktok.", "linkedin.",
-    ]
-    for domain in exclude_domains:
-        if domain in url.lower():
-            return False
-    return url.startswith("http")
+    if not url.startswith("http"):
+        return False
+    host = (urlparse(url).hostname or "").lower()
+    return _EXCLUDE_SITE_NAMES.isdisjoint(host.split("."))
 
 
 def extract_page_content(url, max_chars=5000):
@@ -134,13 +191,13 @@ def extract_page_content(url, max_chars=5000):
     HTML構造からメインコンテンツを取得し、テキストに変換する。
     """
     try:
-        response = requests.get(url, headers=get_headers(), timeout=15)
+        response = _SESSION.get(url, headers=get_headers(), timeout=15)
         response.encoding = response.apparent_encoding
 
         if response.status_code != 200:
             return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        soup = BeautifulSoup(response.text, HTML_PARSER)
 
         # 不要な要素を除去
         for tag in soup.find_all(["script", "style", "nav", "footer", "header", "aside", "form"]):
@@ -175,15 +232,17 @@ def extract_page_content(url, max_chars=5000):
         # パラグラフを優先的に取得
         paragraphs = content_area.find_all("p")
         if paragraphs:
+            # 各段落のテキストは1回だけ取り出す（判定用と出力用で2回たどらない）
+            paragraph_texts = (p.get_text(strip=True) for p in paragraphs)
             text_content = "\n".join([
-                p.get_text(strip=True) for p in paragraphs
-                if len(p.get_text(strip=True)) > 15  # 短すぎるものは除外
+                text for text in paragraph_texts
+                if len(text) > 15  # 短すぎるものは除外
             ])
         else:
             text_content = content_area.get_text(separator="\n", strip=True)
 
         # テキストの整形
-        text_content = re.sub(r'\n{3,}', '\n\n', text_content)
+        text_content = _MANY_NEWLINES_RE.sub('\n\n', text_content)
         text_content = text_content[:max_chars]
 
         return {
@@ -199,10 +258,58 @@ def extract_page_content(url, max_chars=5000):
         return None
 
 
-def research_keyword(keyword, max_sources=5):
+def _research_cache_path(keyword, max_sources):
+    key = hashlib.sha1(f"{keyword}\n{max_sources}".encode("utf-8")).hexdigest()
+    return os.path.join(RESEARCH_CACHE_DIR, f"{key}.json")
+
+
+def _read_research_cache(cache_path):
+    """TTL内のリサーチ結果があれば返す（メモリ → ディスクの順に探す）"""
+    now = time.time()
+    with _research_cache_lock:
+        entry = _research_memory_cache.get(cache_path)
+    if entry and now - entry[0] < RESEARCH_CACHE_TTL:
+        return copy.deepcopy(entry[1])
+
+    try:
+        saved_at = os.path.getmtime(cache_path)
+        if now - saved_at >= RESEARCH_CACHE_TTL:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _remember_research(cache_path, saved_at, result)
+    return copy.deepcopy(result)
+
+
+def _remember_research(cache_path, saved_at, result):
+    """メモリキャッシュに入れる（上限を超えたら古いものから捨てる）"""
+    with _research_cache_lock:
+        _research_memory_cache.pop(cache_path, None)
+        _research_memory_cache[cache_path] = (saved_at, result)
+        while len(_research_memory_cache) > RESEARCH_MEMORY_CACHE_SIZE:
+            del _research_memory_cache[next(iter(_research_memory_cache))]
+
+
+def _write_research_cache(cache_path, result):
+    """リサーチ結果をメモリとディスクに保存する"""
+    _remember_research(cache_path, time.time(), copy.deepcopy(result))
+    try:
+        os.makedirs(RESEARCH_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"  ⚠ リサーチキャッシュ保存エラー: {e}")
+
+
+def research_keyword(keyword, max_sources=5, use_cache=True):
     """
     キーワードに関するWeb情報を包括的に収集する。
     複数ソースから情報を集め、記事生成に使えるデータを返す。
+    use_cache=True の場合、RESEARCH_CACHE_TTL 内に同じ条件で集めた結果があればそれを返す。
 
     Returns:
         dict: {
@@ -215,6 +322,13 @@ def research_keyword(keyword, max_sources=5):
     """
     print(f"\n🔍 リサーチ開始: 「{keyword}」")
 
+    cache_path = _research_cache_path(keyword, max_sources)
+    if use_cache:
+        cached = _read_research_cache(cache_path)
+        if cached is not None:
+            print(f"  ♻️ 保存済みのリサーチ結果を使用します（{cached['source_count']}件のソース）")
+            return cached
+
     # 検索実行
     urls = search_google(keyword, num_results=max_sources + 3)
 
@@ -232,11 +346,14 @@ def research_keyword(keyword, max_sources=5):
     sources = []
     all_headings = []
     all_content_parts = []
+    seen_paragraphs = set()
     
     urls_to_fetch = urls[:max_sources + 3]
     print(f"  🚀 {len(urls_to_fetch)}件のURLを並列処理で取得中...")
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+    # 全URLを同時に取得し、待ち時間を「合計」ではなく「最も遅い1件」分に抑える
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(urls_to_fetch))
+    try:
         future_to_url = {executor.submit(extract_page_content, url): url for url in urls_to_fetch}
         for future in concurrent.futures.as_completed(future_to_url):
             if len(sources) >= max_sources:
@@ -249,13 +366,19 @@ def research_keyword(keyword, max_sources=5):
                     print(f"  ✅ 取得成功: {page_data['title'][:40]}...")
                     sources.append(page_data)
                     all_headings.extend(page_data["headings"])
-                    all_content_parts.append(
-                        f"【出典: {page_data['title'][:60]}】\n{page_data['content'][:3000]}"
-                    )
+                    # 他のソースと同じ段落（定型文・引用の転載など）は除いてから統合する
+                    unique_content = _dedupe_paragraphs(page_data["content"], seen_paragraphs)
+                    if unique_content:
+                        all_content_parts.append(
+                            f"【出典: {page_data['title'][:60]}】\n{unique_content[:3000]}"
+                        )
                 else:
                     print(f"  ⚠ コンテンツ不足: {url[:40]}...")
             except Exception as e:
                 print(f"  ❌ 取得エラー {url[:40]}...: {e}")
+    finally:
+        # 必要数が揃ったら、残りの遅いページの取得完了を待たずに先へ進む
+        executor.shutdown(wait=False, cancel_futures=True)
 
     # 結果を統合
     combined_content = "\n\n---\n\n".join(all_content_parts)
@@ -273,21 +396,43 @@ def research_keyword(keyword, max_sources=5):
     }
 
     print(f"  ✅ リサーチ完了: {len(sources)}件のソースを取得")
+    # 1件も取れなかった結果（一時的なブロックなど）はキャッシュしない
+    if sources:
+        _write_research_cache(cache_path, result)
     return result
 
 
+def _dedupe_paragraphs(text, seen):
+    """
+    すでに seen にある段落（空白・全角半角の違いは無視）を取り除いたテキストを返す。
+    残した段落は seen に追加する。
+    """
+    unique = []
+    for paragraph in text.split("\n"):
+        key = _WHITESPACE_RE.sub("", unicodedata.normalize("NFKC", paragraph))
+        if not key:
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(paragraph)
+    return "\n".join(unique)
+
+
 def research_multiple_keywords(keywords, max_sources_per_keyword=3):
     """
     複数キーワードでリサーチを実行し、結果を統合する。
     例: ["フィンガーライム 育て方", "フィンガーライム 冬越し"]
+    キーワードは RESEARCH_KEYWORD_WORKERS 件ずつ並列に調べる（結果はキーワードの順番どおり）。
+    検索エンジンへのリクエスト間隔は search_google 側で空ける。
     """
-    all_results = []
-    for kw in keywords:
-        result = research_keyword(kw, max_sources=max_sources_per_keyword)
-        all_results.append(result)
-        time.sleep(2)  # キーワード間の待ち時間
-
-    return all_results
+    if not keywords:
+        return []
+    workers = min(RESEARCH_KEYWORD_WORKERS, len(keywords))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda kw: research_keyword(kw, max_sources=max_sources_per_keyword), keywords
+        ))
 
 
 # テスト用
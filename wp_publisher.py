@@ -6,8 +6,11 @@ WordPress REST APIを使って記事を下書き投稿する。
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import base64
+import concurrent.futures
 
 # ==========================================
 # WordPress 接続設定
@@ -18,13 +21,45 @@ WP_SITE_URL = ""  # 例: "https://sasayoshi-garden.com"
 WP_USERNAME = ""  # WordPressのユーザー名
 WP_APP_PASSWORD = ""  # アプリケーションパスワード
 
+# Keep-Aliveで接続を使い回すためのHTTPセッション（初回利用時に作成）
+_session = None
+# エンコード済みのBasic認証ヘッダー: (ユーザー名:パスワード, ヘッダー値)
+_auth_header_cache = None
 
-def configure(site_url, username, app_password):
-    """WordPress接続情報を設定する"""
-    global WP_SITE_URL, WP_USERNAME, WP_APP_PASSWORD
+
+def create_session():
+    """コネクションプールを持つHTTPセッションを作成する"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_session():
+    """モジュール共通のHTTPセッションを返す"""
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def configure(site_url, username, app_password, session=None):
+    """
+    WordPress接続情報を設定する。
+    session を渡すと、そのHTTPセッション（接続プール）を以降の通信で使う。
+    """
+    global WP_SITE_URL, WP_USERNAME, WP_APP_PASSWORD, _session
     WP_SITE_URL = site_url.rstrip("/")
     WP_USERNAME = username
     WP_APP_PASSWORD = app_password
+    if session is not None:
+        _session = session
+    # 認証ヘッダーはここで一度だけエンコードしておく
+    _get_auth_header()
 
 
 def is_configured():
@@ -33,10 +68,16 @@ def is_configured():
 
 
 def _get_auth_header():
-    """Basic認証ヘッダーを生成する"""
+    """
+    Basic認証ヘッダーを返す。
+    エンコード済みの値は接続情報が変わるまで使い回す（呼び出し側で書き換えてよいようにコピーを返す）。
+    """
+    global _auth_header_cache
     credentials = f"{WP_USERNAME}:{WP_APP_PASSWORD}"
-    encoded = base64.b64encode(credentials.encode()).decode()
-    return {"Authorization": f"Basic {encoded}"}
+    if _auth_header_cache is None or _auth_header_cache[0] != credentials:
+        encoded = base64.b64encode(credentials.encode()).decode()
+        _auth_header_cache = (credentials, f"Basic {encoded}")
+    return {"Authorization": _auth_header_cache[1]}
 
 
 def test_connection():
@@ -54,7 +95,7 @@ def test_connection():
         headers = _get_auth_header()
         headers["Content-Type"] = "application/json"
 
-        response = requests.get(url, headers=headers, timeout=15)
+        response = _get_session().get(url, headers=headers, timeout=15)
 
         if response.status_code == 200:
             return True, "WordPress接続成功！"
@@ -108,7 +149,7 @@ def create_draft(title, content, meta_description="", categories=None, tags=None
                 "rank_math_description": meta_description,
             }
 
-        response = requests.post(url, headers=headers, json=post_data, timeout=30)
+        response = _get_session().post(url, headers=headers, json=post_data, timeout=30)
 
         if response.status_code in [200, 201]:
             post_info = response.json()
@@ -126,25 +167,54 @@ def create_draft(title, content, meta_description="", categories=None, tags=None
         return False, f"投稿例外: {e}"
 
 
+# カテゴリ・タグ一覧の2ページ目以降を同時に取得する数
+TERMS_FETCH_WORKERS = 4
+
+
+def _get_all_terms(endpoint):
+    """
+    カテゴリ・タグなどの一覧を全ページ取得する（1ページ100件まで）。
+    1ページ目のレスポンスヘッダー X-WP-TotalPages を見て、残りのページは並列に取得する。
+    """
+    url = f"{WP_SITE_URL}/wp-json/wp/v2/{endpoint}?per_page=100"
+    headers = _get_auth_header()
+    session = _get_session()
+
+    response = session.get(url, headers=headers, timeout=15)
+    if response.status_code != 200:
+        return []
+    terms = response.json()
+
+    try:
+        total_pages = int(response.headers.get("X-WP-TotalPages", 1))
+    except ValueError:
+        total_pages = 1
+
+    if total_pages > 1:
+        def _fetch_page(page):
+            page_response = session.get(f"{url}&page={page}", headers=headers, timeout=15)
+            return page_response.json() if page_response.status_code == 200 else []
+
+        workers = min(TERMS_FETCH_WORKERS, total_pages - 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for page_terms in executor.map(_fetch_page, range(2, total_pages + 1)):
+                terms.extend(page_terms)
+
+    return [
+        {"id": term["id"], "name": term["name"], "slug": term["slug"]}
+        for term in terms
+    ]
+
+
 def get_categories():
     """WordPressのカテゴリ一覧を取得する"""
     if not is_configured():
         return []
 
     try:
-        url = f"{WP_SITE_URL}/wp-json/wp/v2/categories?per_page=100"
-        headers = _get_auth_header()
-        response = requests.get(url, headers=headers, timeout=15)
-
-        if response.status_code == 200:
-            return [
-                {"id": cat["id"], "name": cat["name"], "slug": cat["slug"]}
-                for cat in response.json()
-            ]
+        return _get_all_terms("categories")
     except Exception:
-        pass
-
-    return []
+        return []
 
 
 def get_tags():
@@ -153,16 +223,6 @@ def get_tags():
         return []
 
     try:
-        url = f"{WP_SITE_URL}/wp-json/wp/v2/tags?per_page=100"
-        headers = _get_auth_header()
-        response = requests.get(url, headers=headers, timeout=15)
-
-        if response.status_code == 200:
-            return [
-                {"id": tag["id"], "name": tag["name"], "slug": tag["slug"]}
-                for tag in response.json()
-            ]
+        return _get_all_terms("tags")
     except Exception:
-        pass
-
-    return []
+        return []